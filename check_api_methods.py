@@ -3,23 +3,13 @@ Check what methods are available in YouTubeTranscriptApi
 """
 
 from youtube_transcript_api import YouTubeTranscriptApi
-import inspect
 
-print("Available methods in YouTubeTranscriptApi:")
+print("Checking for specific methods in YouTubeTranscriptApi:")
 print("=" * 50)
 
-# Get all methods
-for name in dir(YouTubeTranscriptApi):
-    if not name.startswith('_'):
-        attr = getattr(YouTubeTranscriptApi, name)
-        if callable(attr):
-            print(f"  - {name}")
-            
-print("\n" + "=" * 50)
-print("Checking for specific methods:")
-print("  - get_transcript:", hasattr(YouTubeTranscriptApi, 'get_transcript'))
-print("  - list_transcripts:", hasattr(YouTubeTranscriptApi, 'list_transcripts'))
-print("  - get_transcripts:", hasattr(YouTubeTranscriptApi, 'get_transcripts'))
+wanted = ("list", "fetch", "list_transcripts", "get_transcript", "get_transcripts")
+for name in wanted:
+    print(f"  - {name}:", hasattr(YouTubeTranscriptApi, name))
 
 # Test the correct way to get transcripts
 print("\n" + "=" * 50)
@@ -41,9 +31,7 @@ try:
         print(f"  ✅ Success! Got {len(data)} segments")
         
         # Show how to use it
-        output = ""
-        for segment in data:
-            output += segment['text'] + " "
+        output = " ".join(segment['text'] for segment in data)
         
         print(f"  Total text length: {len(output)} characters")
         print(f"  Preview: {output[:100]}...")
@@ -52,15 +40,3 @@ try:
 except Exception as e:
     print(f"  ❌ Error: {e}")
 
-# Try alternative import
-print("\n" + "=" * 50)
-print("Alternative import method:")
-
-try:
-    from youtube_transcript_api import YouTubeTranscriptApi as YT
-    print("Methods available via YT alias:")
-    for name in dir(YT):
-        if not name.startswith('_') and callable(getattr(YT, name)):
-            print(f"  - YT.{name}")
-except Exception as e:
-    print(f"Error with alternative import: {e}")
\ No newline at end of file
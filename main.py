@@ -2,16 +2,21 @@
 YouTube to Flashcards AI - FastAPI Backend
 Complete main.py with frontend integration
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import ValidationError
 import os
 import sys
+import time
+from pathlib import Path
+import asyncio
 from datetime import datetime
-from typing import Optional
+from functools import lru_cache
+from typing import List, Optional
 import logging
+import orjson
 import uvicorn
 from dotenv import load_dotenv
 
@@ -22,8 +27,9 @@ load_dotenv()
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Import services and models
-from services.transcript import TranscriptService
+from services.transcript import TranscriptService, create_http_client
 from services.ai_processor import AIProcessor
+from services.cache import clear_cache, disk_cache
 from models import (
     FlashcardRequest,
     FlashcardSet,
@@ -45,7 +51,8 @@ app = FastAPI(
     description="Convert YouTube educational videos into interactive study flashcards using AI",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -65,19 +72,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that lets browsers cache assets instead of revalidating each load"""
+    
+    def __init__(self, *args, max_age: int = 3600, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = f"public, max-age={max_age}"
+    
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers.setdefault("Cache-Control", self.cache_control)
+        return response
+
+STATIC_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", 3600))
+
 # Mount static files for frontend (if frontend directory exists)
 if os.path.exists("frontend"):
     # Serve CSS files
     if os.path.exists("frontend/css"):
-        app.mount("/css", StaticFiles(directory="frontend/css"), name="css")
+        app.mount("/css", CachedStaticFiles(directory="frontend/css", max_age=STATIC_MAX_AGE), name="css")
     
     # Serve JS files
     if os.path.exists("frontend/js"):
-        app.mount("/js", StaticFiles(directory="frontend/js"), name="js")
+        app.mount("/js", CachedStaticFiles(directory="frontend/js", max_age=STATIC_MAX_AGE), name="js")
     
     # Serve assets
     if os.path.exists("frontend/assets"):
-        app.mount("/assets", StaticFiles(directory="frontend/assets"), name="assets")
+        app.mount("/assets", CachedStaticFiles(directory="frontend/assets", max_age=STATIC_MAX_AGE), name="assets")
     
     logger.info("Frontend static files mounted successfully")
 else:
@@ -91,8 +112,9 @@ ai_processor = AIProcessor()
 @app.get("/", include_in_schema=False)
 async def read_root():
     """Serve the frontend index.html if available, otherwise return API info"""
-    if os.path.exists("frontend/index.html"):
-        return FileResponse('frontend/index.html')
+    index_html = getattr(app.state, "index_html", None)
+    if index_html is not None:
+        return Response(index_html, media_type="text/html")
     return {
         "name": "YouTube to Flashcards AI API",
         "version": "1.0.0",
@@ -119,20 +141,45 @@ async def api_info():
         "version": "1.0.0",
         "endpoints": {
             "generate_flashcards": "/api/v1/flashcards/generate",
+            "generate_flashcards_batch": "/api/v1/flashcards/generate_batch",
+            "stream_flashcards": "/api/v1/flashcards/stream",
+            "clear_cache": "/api/v1/cache/{video_id}",
             "health": "/health",
+            "stats": "/api/v1/stats",
             "documentation": "/docs"
         },
         "description": "YouTube to Flashcards AI API"
     }
 
+def build_flashcard_set(
+    request: FlashcardRequest,
+    video_id: str,
+    transcript_data: dict,
+    flashcards_data: List[dict]
+) -> FlashcardSet:
+    """Assemble the API response from transcript data and generated cards"""
+    flashcards = [Flashcard.model_validate(card_data) for card_data in flashcards_data]
+    
+    return FlashcardSet(
+        video_url=request.youtube_url,
+        video_title=transcript_data.get('video_title', 'Unknown Title'),
+        video_id=video_id,
+        channel_name=transcript_data.get('channel_name'),
+        duration=round(transcript_data.get('duration', 0)),
+        flashcards=flashcards,
+        transcript_length=len(transcript_data.get('full_text', '')),
+        language=transcript_data.get('language', request.language)
+    )
+
 # Main flashcard generation endpoint
 @app.post("/api/v1/flashcards/generate", response_model=FlashcardSet, tags=["Flashcards"])
-async def generate_flashcards(request: FlashcardRequest):
+async def generate_flashcards(request: FlashcardRequest, response: Response):
     """
     Generate flashcards from a YouTube video
     
     Args:
         request: FlashcardRequest containing YouTube URL and preferences
+        response: Outgoing response, used to set the X-Cache header
         
     Returns:
         FlashcardSet with generated flashcards
@@ -141,21 +188,18 @@ async def generate_flashcards(request: FlashcardRequest):
     
     try:
         # Step 1: Extract video ID and validate URL
-        video_id = transcript_service.extract_video_id(request.youtube_url)
+        video_id = request.video_id or transcript_service.extract_video_id(request.youtube_url)
         if not video_id:
             raise HTTPException(
                 status_code=400,
                 detail="Invalid YouTube URL. Please provide a valid YouTube video URL."
             )
         
-        # Step 2: Get video metadata
-        logger.info(f"Fetching metadata for video ID: {video_id}")
-        metadata = transcript_service.get_video_metadata(request.youtube_url)
-        
-        # Step 3: Extract transcript
-        logger.info(f"Extracting transcript for video ID: {video_id}")
-        transcript_data = transcript_service.get_transcript(
-            request.youtube_url,
+        # Steps 2 & 3: Fetch video metadata and transcript. The service
+        # issues both network calls concurrently.
+        logger.info(f"Fetching metadata and transcript for video ID: {video_id}")
+        transcript_data = await transcript_service.get_transcript(
+            video_id,
             language=request.language,
             preserve_formatting=False
         )
@@ -166,14 +210,20 @@ async def generate_flashcards(request: FlashcardRequest):
                 detail="Could not extract transcript. The video may not have captions enabled."
             )
         
-        # Step 4: Generate flashcards using AI
+        response.headers["X-Cache"] = {
+            'memory': "HIT",
+            'disk': "HIT-DISK"
+        }.get(transcript_data.get('cache'), "MISS")
+        
+        # Step 4: Generate flashcards using AI, covering the whole transcript
         logger.info(f"Generating {request.num_cards} flashcards with {request.difficulty_level} difficulty")
-        flashcards_data = ai_processor.generate_flashcards(
+        flashcards_data = await ai_processor.generate_flashcards_long(
             transcript=transcript_data['full_text'],
             num_cards=request.num_cards,
             difficulty_level=request.difficulty_level,
             subject_focus=request.subject_focus,
-            video_title=transcript_data.get('video_title')
+            video_title=transcript_data.get('video_title'),
+            segments=transcript_data.get('segments')
         )
         
         if not flashcards_data:
@@ -182,31 +232,10 @@ async def generate_flashcards(request: FlashcardRequest):
                 detail="Failed to generate flashcards. Please try again."
             )
         
-        # Step 5: Create flashcard objects
-        flashcards = []
-        for card_data in flashcards_data:
-            flashcard = Flashcard(
-                question=card_data['question'],
-                answer=card_data['answer'],
-                difficulty=card_data.get('difficulty', 'medium'),
-                topic=card_data.get('topic'),
-                explanation=card_data.get('explanation')
-            )
-            flashcards.append(flashcard)
+        # Steps 5 & 6: Create and return FlashcardSet
+        flashcard_set = build_flashcard_set(request, video_id, transcript_data, flashcards_data)
         
-        # Step 6: Create and return FlashcardSet
-        flashcard_set = FlashcardSet(
-            video_url=request.youtube_url,
-            video_title=transcript_data.get('video_title', 'Unknown Title'),
-            video_id=video_id,
-            channel_name=transcript_data.get('channel_name'),
-            duration=transcript_data.get('duration', 0),
-            flashcards=flashcards,
-            transcript_length=len(transcript_data.get('full_text', '')),
-            language=transcript_data.get('language', request.language)
-        )
-        
-        logger.info(f"Successfully generated {len(flashcards)} flashcards for video: {video_id}")
+        logger.info(f"Successfully generated {len(flashcard_set.flashcards)} flashcards for video: {video_id}")
         return flashcard_set
         
     except HTTPException:
@@ -221,6 +250,231 @@ async def generate_flashcards(request: FlashcardRequest):
             detail=f"An unexpected error occurred: {str(e)}"
         )
 
+# Streaming flashcard generation endpoint
+def sse_event(event: str, data: dict) -> bytes:
+    """Encode a Server-Sent Event"""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+@app.get("/api/v1/flashcards/stream", tags=["Flashcards"])
+async def stream_flashcards(
+    youtube_url: str,
+    num_cards: int = 10,
+    difficulty_level: str = "mixed",
+    subject_focus: Optional[str] = None,
+    language: str = "en"
+):
+    """
+    Generate flashcards from a YouTube video as a Server-Sent Events stream
+    
+    Emits a "metadata" event with video details, one "flashcard" event per
+    card as soon as the model finishes writing it, and a final "done" event
+    (or "error" if generation fails part-way).
+    """
+    try:
+        request = FlashcardRequest(
+            youtube_url=youtube_url,
+            num_cards=num_cards,
+            difficulty_level=difficulty_level,
+            subject_focus=subject_focus,
+            language=language
+        )
+    except ValidationError as e:
+        logger.error(f"Validation error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    logger.info(f"Streaming flashcards for URL: {request.youtube_url}")
+    
+    video_id = request.video_id or transcript_service.extract_video_id(request.youtube_url)
+    if not video_id:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid YouTube URL. Please provide a valid YouTube video URL."
+        )
+    
+    # Fetch the transcript before streaming starts, so failures still get
+    # a proper HTTP status code
+    try:
+        transcript_data = await transcript_service.get_transcript(
+            video_id,
+            language=request.language,
+            preserve_formatting=False
+        )
+    except Exception as e:
+        logger.error(f"Transcript extraction failed: {e}")
+        transcript_data = None
+    
+    if not transcript_data or not transcript_data.get('full_text'):
+        raise HTTPException(
+            status_code=404,
+            detail="Could not extract transcript. The video may not have captions enabled."
+        )
+    
+    async def event_stream():
+        yield sse_event("metadata", {
+            "video_url": request.youtube_url,
+            "video_id": video_id,
+            "video_title": transcript_data.get('video_title', 'Unknown Title'),
+            "channel_name": transcript_data.get('channel_name'),
+            "duration": transcript_data.get('duration', 0),
+            "language": transcript_data.get('language', request.language)
+        })
+        
+        count = 0
+        try:
+            async for card_data in ai_processor.generate_flashcards_stream(
+                transcript=transcript_data['full_text'],
+                num_cards=request.num_cards,
+                difficulty_level=request.difficulty_level,
+                subject_focus=request.subject_focus,
+                video_title=transcript_data.get('video_title')
+            ):
+                try:
+                    flashcard = Flashcard.model_validate(card_data)
+                except ValidationError as e:
+                    logger.warning(f"Skipping invalid streamed flashcard: {e}")
+                    continue
+                count += 1
+                yield sse_event("flashcard", flashcard.model_dump(mode="json"))
+        except Exception as e:
+            logger.error(f"Error streaming flashcards: {e}")
+            yield sse_event("error", {"error": "Failed to generate flashcards. Please try again."})
+            return
+        
+        logger.info(f"Streamed {count} flashcards for video: {video_id}")
+        yield sse_event("done", {"count": count})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Batch flashcard generation endpoint
+MAX_BATCH_REQUESTS = 20
+
+@app.post("/api/v1/flashcards/generate_batch", response_model=List[FlashcardSet], tags=["Flashcards"])
+async def generate_flashcards_batch(batch: List[FlashcardRequest]):
+    """
+    Generate flashcards for several YouTube videos at once
+    
+    Transcripts are fetched concurrently and short ones are sent to the
+    AI model together, so a batch costs far fewer round-trips than calling
+    /api/v1/flashcards/generate once per video.
+    
+    Args:
+        batch: List of FlashcardRequest objects
+        
+    Returns:
+        List of FlashcardSet objects, in request order
+    """
+    if not batch:
+        raise HTTPException(status_code=400, detail="Batch must contain at least one request.")
+    if len(batch) > MAX_BATCH_REQUESTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot process more than {MAX_BATCH_REQUESTS} videos per batch."
+        )
+    
+    logger.info(f"Generating flashcards for a batch of {len(batch)} videos")
+    
+    try:
+        # Step 1: Extract and validate video IDs
+        video_ids = []
+        for request in batch:
+            video_id = request.video_id or transcript_service.extract_video_id(request.youtube_url)
+            if not video_id:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid YouTube URL: {request.youtube_url}"
+                )
+            video_ids.append(video_id)
+        
+        # Step 2: Fetch all transcripts concurrently
+        transcripts = await asyncio.gather(
+            *(
+                transcript_service.get_transcript(
+                    video_id,
+                    language=request.language,
+                    preserve_formatting=False
+                )
+                for request, video_id in zip(batch, video_ids)
+            ),
+            return_exceptions=True
+        )
+        
+        for video_id, transcript_data in zip(video_ids, transcripts):
+            if isinstance(transcript_data, BaseException) or not transcript_data.get('full_text'):
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Could not extract transcript for video {video_id}. "
+                           f"The video may not have captions enabled."
+                )
+        
+        # Step 3: Generate all flashcards with batched AI calls
+        flashcard_batches = await ai_processor.generate_flashcards_batch([
+            {
+                'transcript': transcript_data['full_text'],
+                'num_cards': request.num_cards,
+                'difficulty_level': request.difficulty_level,
+                'subject_focus': request.subject_focus,
+                'video_title': transcript_data.get('video_title')
+            }
+            for request, transcript_data in zip(batch, transcripts)
+        ])
+        
+        # Step 4: Create FlashcardSets
+        flashcard_sets = []
+        for request, video_id, transcript_data, flashcards_data in zip(
+            batch, video_ids, transcripts, flashcard_batches
+        ):
+            if not flashcards_data:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Failed to generate flashcards for video {video_id}. Please try again."
+                )
+            flashcard_sets.append(
+                build_flashcard_set(request, video_id, transcript_data, flashcards_data)
+            )
+        
+        logger.info(f"Successfully generated flashcards for {len(flashcard_sets)} videos")
+        return flashcard_sets
+        
+    except HTTPException:
+        raise
+    except ValidationError as e:
+        logger.error(f"Validation error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Unexpected error generating batch flashcards: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"An unexpected error occurred: {str(e)}"
+        )
+
+# Outbound concurrency stats
+@app.get("/api/v1/stats", tags=["System"])
+async def get_stats():
+    """Report in-flight and queued outbound calls per downstream service and LLM cache hits"""
+    return {
+        "openai": ai_processor.limiter.stats(),
+        "youtube": transcript_service.limiter.stats(),
+        "llm_cache": ai_processor.cache.stats(),
+        "semantic_cache": ai_processor.semantic_cache.stats() if ai_processor.semantic_cache else None
+    }
+
+# Cache management endpoints
+@app.delete("/api/v1/cache/{video_id}", tags=["Cache"])
+async def delete_cached_video(video_id: str):
+    """Drop cached metadata and transcripts for a single video"""
+    removed = await clear_cache(video_id)
+    return {"video_id": video_id, "removed": removed}
+
+@app.delete("/api/v1/cache", tags=["Cache"])
+async def delete_all_cached():
+    """Drop all cached metadata and transcripts"""
+    removed = await clear_cache()
+    return {"removed": removed}
+
 # Sample/demo flashcards endpoint for testing
 @app.get("/api/v1/flashcards/sample", response_model=FlashcardSet, tags=["Flashcards"])
 async def get_sample_flashcards():
@@ -272,28 +526,36 @@ async def get_sample_flashcards():
     )
 
 # Error handlers
+@lru_cache(maxsize=1)
+def _timestamp_for_second(second: int) -> str:
+    return datetime.utcfromtimestamp(second).isoformat()
+
+def error_timestamp() -> str:
+    """ISO timestamp for error responses, formatted at most once per second"""
+    return _timestamp_for_second(int(time.time()))
+
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
     """Handle HTTP exceptions"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": exc.detail,
             "status_code": exc.status_code,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": error_timestamp()
         }
     )
 
 @app.exception_handler(ValidationError)
 async def validation_exception_handler(request, exc):
     """Handle validation errors"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=422,
         content={
             "error": "Validation error",
             "detail": str(exc),
             "status_code": 422,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": error_timestamp()
         }
     )
 
@@ -301,13 +563,13 @@ async def validation_exception_handler(request, exc):
 async def general_exception_handler(request, exc):
     """Handle general exceptions"""
     logger.error(f"Unhandled exception: {exc}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal server error",
             "detail": "An unexpected error occurred. Please try again later.",
             "status_code": 500,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": error_timestamp()
         }
     )
 
@@ -317,6 +579,17 @@ async def startup_event():
     """Run startup tasks"""
     logger.info("Starting YouTube to Flashcards AI API...")
     
+    # One keep-alive connection pool for all outbound YouTube requests
+    app.state.http = create_http_client()
+    transcript_service.client = app.state.http
+    
+    # Open the first connection in the background; startup doesn't wait on YouTube
+    app.state.warm_up = asyncio.create_task(transcript_service.warm_up())
+    
+    # Concurrency caps for each downstream service
+    app.state.openai_limiter = ai_processor.limiter
+    app.state.youtube_limiter = transcript_service.limiter
+    
     # Check for OpenAI API key
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key or api_key == "your_openai_api_key_here":
@@ -324,10 +597,13 @@ async def startup_event():
     else:
         logger.info("OpenAI API key configured ✓")
     
-    # Check if frontend exists
-    if os.path.exists("frontend/index.html"):
+    # Load the landing page once instead of re-reading it on every hit
+    index_path = Path("frontend/index.html")
+    if index_path.exists():
+        app.state.index_html = index_path.read_bytes()
         logger.info("Frontend files found ✓")
     else:
+        app.state.index_html = None
         logger.info("Frontend files not found - API-only mode")
     
     logger.info("API ready at http://localhost:8000")
@@ -338,6 +614,9 @@ async def startup_event():
 async def shutdown_event():
     """Run cleanup tasks"""
     logger.info("Shutting down YouTube to Flashcards AI API...")
+    await transcript_service.aclose()
+    await ai_processor.aclose()
+    disk_cache.close()
 
 # Main entry point
 if __name__ == "__main__":
@@ -345,10 +624,15 @@ if __name__ == "__main__":
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", 8000))
     reload = os.getenv("RELOAD", "true").lower() == "true"
+    workers = int(os.getenv("WORKERS", 1))
+    
+    # uvloop (libuv event loop) is not available on Windows
+    loop = "uvloop" if sys.platform != "win32" else "asyncio"
     
     # Log configuration
     logger.info(f"Starting server on {host}:{port}")
     logger.info(f"Auto-reload: {reload}")
+    logger.info(f"Workers: {workers}, event loop: {loop}")
     
     # Run the application
     uvicorn.run(
@@ -356,5 +640,10 @@ if __name__ == "__main__":
         host=host,
         port=port,
         reload=reload,
+        workers=workers,
+        loop=loop,
+        http="httptools",
+        limit_concurrency=int(os.getenv("LIMIT_CONCURRENCY", 1000)),
+        backlog=2048,
         log_level="info"
     )
\ No newline at end of file
@@ -3,11 +3,19 @@ Data models for YouTube Flashcards AI application
 """
 from datetime import datetime
 from typing import List, Optional, Literal
-from pydantic import BaseModel, Field, HttpUrl, validator
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl, field_validator, model_validator
 import re
 from uuid import uuid4
 
 
+# Compiled once at import; validation runs on every request
+_YT_RE = re.compile(
+    r'(?:https?://)?(?:www\.)?(?:youtube|youtu|youtube-nocookie)\.(?:com|be)/'
+    r'(?:watch\?v=|embed/|v/|shorts/|.+\?v=)?(?P<id>[^&=%\?]{11})'
+)
+_VIDEO_ID_RE = re.compile(r'[0-9A-Za-z_-]{11}')
+
+
 class FlashcardRequest(BaseModel):
     """Request model for flashcard generation"""
     youtube_url: str = Field(..., description="YouTube video URL")
@@ -22,19 +30,29 @@ class FlashcardRequest(BaseModel):
         description="Specific subject or topic to focus on"
     )
     language: str = Field("en", description="Language code for transcript")
+    video_id: Optional[str] = Field(
+        None,
+        description="Video ID, derived from youtube_url during validation"
+    )
     
-    @validator('youtube_url')
+    @field_validator('youtube_url')
+    @classmethod
     def validate_youtube_url(cls, v):
         """Validate YouTube URL format"""
-        youtube_regex = (
-            r'(https?://)?(www\.)?(youtube|youtu|youtube-nocookie)\.(com|be)/'
-            r'(watch\?v=|embed/|v/|.+\?v=)?([^&=%\?]{11})'
-        )
-        if not re.match(youtube_regex, v):
+        if not _YT_RE.match(v):
             raise ValueError('Invalid YouTube URL format')
         return v
     
-    @validator('num_cards')
+    @model_validator(mode="after")
+    def attach_video_id(self):
+        """Keep the video ID matched during validation so handlers needn't re-parse the URL"""
+        match = _YT_RE.match(self.youtube_url)
+        video_id = match.group('id') if match else None
+        self.video_id = video_id if video_id and _VIDEO_ID_RE.fullmatch(video_id) else None
+        return self
+    
+    @field_validator('num_cards')
+    @classmethod
     def validate_num_cards(cls, v):
         """Ensure reasonable number of flashcards"""
         if v < 1:
@@ -46,15 +64,10 @@ class FlashcardRequest(BaseModel):
 
 class Flashcard(BaseModel):
     """Individual flashcard model"""
-    id: str = Field(default_factory=lambda: str(uuid4()))
-    question: str = Field(..., min_length=10, description="Question text")
-    answer: str = Field(..., min_length=5, description="Answer text")
-    difficulty: Literal["easy", "medium", "hard"] = Field(..., description="Difficulty level")
-    topic: Optional[str] = Field(None, description="Topic or category")
-    explanation: Optional[str] = Field(None, description="Additional explanation or context")
-    
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        str_strip_whitespace=True,
+        json_schema_extra={
             "example": {
                 "question": "What is the capital of France?",
                 "answer": "Paris",
@@ -63,23 +76,20 @@ class Flashcard(BaseModel):
                 "explanation": "Paris has been the capital of France since 987 AD."
             }
         }
+    )
+    
+    id: str = Field(default_factory=lambda: str(uuid4()))
+    question: str = Field(..., min_length=10, description="Question text")
+    answer: str = Field(..., min_length=5, description="Answer text")
+    difficulty: Literal["easy", "medium", "hard"] = Field(..., description="Difficulty level")
+    topic: Optional[str] = Field(None, description="Topic or category")
+    explanation: Optional[str] = Field(None, description="Additional explanation or context")
 
 
 class FlashcardSet(BaseModel):
     """Collection of flashcards from a video"""
-    id: str = Field(default_factory=lambda: str(uuid4()))
-    video_url: str
-    video_title: str
-    video_id: str
-    channel_name: Optional[str] = None
-    duration: Optional[int] = None  # in seconds
-    flashcards: List[Flashcard]
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    transcript_length: int = 0
-    language: str = "en"
-    
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "video_url": "https://youtube.com/watch?v=abc123",
                 "video_title": "Introduction to Python",
@@ -93,6 +103,18 @@ class FlashcardSet(BaseModel):
                 ]
             }
         }
+    )
+    
+    id: str = Field(default_factory=lambda: str(uuid4()))
+    video_url: str
+    video_title: str
+    video_id: str
+    channel_name: Optional[str] = None
+    duration: Optional[int] = None  # in seconds
+    flashcards: List[Flashcard]
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    transcript_length: int = 0
+    language: str = "en"
 
 
 class ErrorResponse(BaseModel):
@@ -2,30 +2,134 @@
 AI-powered Flashcard Generation Service using OpenAI
 """
 import os
-import json
+import re
+import math
+import itertools
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
+from collections import defaultdict
+import httpx
+import ijson
+import orjson
+import tiktoken
+from typing import List, Dict, Any, Optional, AsyncIterator, ClassVar
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from dotenv import load_dotenv
 
+from .limits import ConcurrencyLimiter
+from .llm_cache import create_llm_cache, create_semantic_cache
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
 
+class _FlashcardStreamParser:
+    """
+    Incrementally extract flashcards from a streamed JSON response
+    
+    Feeds each chunk to an ijson coroutine listening on "flashcards.item",
+    so every item of the "flashcards" array is returned as soon as its
+    closing brace arrives.
+    """
+    
+    def __init__(self):
+        self._cards = ijson.sendable_list()
+        self._coro = ijson.items_coro(self._cards, 'flashcards.item', use_float=True)
+    
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """Consume a chunk of the response and return any completed cards"""
+        self._coro.send(text.encode('utf-8'))
+        cards = list(self._cards)
+        del self._cards[:]
+        return cards
+
+
 class AIProcessor:
     """Service for generating flashcards using OpenAI GPT"""
     
+    SYSTEM_PROMPT: ClassVar[str] = """You are an expert educational content creator specializing in creating effective flashcards for learning and retention.
+
+Your task is to analyze video transcripts and create high-quality flashcards that:
+1. Test key concepts and important information from the content
+2. Are clear, concise, and unambiguous
+3. Follow spaced repetition best practices
+4. Include a mix of factual recall, conceptual understanding, and application questions
+5. Have appropriate difficulty levels
+
+You must respond with valid JSON in the following format:
+{
+    "flashcards": [
+        {
+            "question": "Clear, specific question",
+            "answer": "Concise, accurate answer",
+            "difficulty": "easy|medium|hard",
+            "topic": "Main topic or category",
+            "explanation": "Optional additional context or explanation"
+        }
+    ]
+}
+
+Guidelines:
+- Questions should be specific and have clear answers
+- Avoid yes/no questions unless they test important facts
+- Include 'why' and 'how' questions for deeper understanding
+- Answers should be concise but complete
+- Add explanations for complex topics
+- Ensure factual accuracy based on the transcript content"""
+    
+    # Transcript tokens sent per call, further capped so the system prompt,
+    # transcript and completion all fit in the model's context window
+    MAX_TRANSCRIPT_TOKENS = 8000
+    CONTEXT_TOKENS = 128000
+    MAX_OUTPUT_TOKENS = 2000
+    PROMPT_OVERHEAD_TOKENS = 200  # instructions around the transcript
+    
+    # Long transcripts are split into chunks of this many tokens, each
+    # handled by its own (concurrent) completion
+    CHUNK_TOKENS = 2000
+    CHUNK_OVERLAP_TOKENS = 200
+    MAX_CONCURRENT_CHUNKS = 5
+    
+    # Limits for packing several short transcripts into one completion
+    MAX_TASKS_PER_CALL = 5
+    MAX_CARDS_PER_CALL = 25
+    MAX_PROMPT_TOKENS_PER_CALL = 12000
+    MAX_CONCURRENT_BATCH_CALLS = 10
+    
     def __init__(self):
         """Initialize OpenAI client"""
         api_key = os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
         
-        self.client = OpenAI(api_key=api_key)
+        # Pooled keep-alive connections so concurrent calls don't each
+        # pay a new TLS handshake
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=64)
+            )
+        )
         self.model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        self.temperature = float(os.getenv("OPENAI_TEMPERATURE", "0.7"))
+        
+        # Default concurrency follows the account's requests-per-minute tier
+        # when OPENAI_RPM is set
+        rpm = os.getenv("OPENAI_RPM")
+        default_concurrency = max(1, int(rpm) // 60) if rpm else 20
+        self.limiter = ConcurrencyLimiter(
+            "openai",
+            int(os.getenv("OPENAI_MAX_CONCURRENCY", default_concurrency))
+        )
+        # Loaded on first use: tiktoken downloads the BPE file the first
+        # time, which shouldn't block (or break) app startup
+        self._encoding: Optional["tiktoken.Encoding"] = None
+        self._transcript_token_budget: Optional[int] = None
+        self.cache = create_llm_cache()
+        self.semantic_cache = create_semantic_cache()
         
-    def generate_flashcards(
+    async def generate_flashcards(
         self,
         transcript: str,
         num_cards: int = 10,
@@ -59,21 +163,45 @@ class AIProcessor:
                 video_title=video_title
             )
             
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ]
+            
+            # Identical prompts return the previously generated cards
+            cache_key = self.cache.cache_key(self.model, messages, self.temperature)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("Using cached flashcards")
+                return list(cached)
+            
+            # Near-duplicate transcripts with the same parameters reuse cards too
+            embedding = None
+            partition = (self.model, num_cards, difficulty_level, subject_focus)
+            if self.semantic_cache is not None:
+                try:
+                    async with self.limiter:
+                        embedding = await self.semantic_cache.embed(self.client, transcript)
+                    cached = self.semantic_cache.get(embedding, partition)
+                    if cached is not None:
+                        logger.info("Using semantically cached flashcards")
+                        return list(cached)
+                except Exception as e:
+                    logger.warning(f"Semantic cache lookup failed: {e}")
+            
             # Call OpenAI API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.7,
-                max_tokens=2000,
-                response_format={"type": "json_object"}
-            )
+            async with self.limiter:
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    max_tokens=self.MAX_OUTPUT_TOKENS,
+                    response_format={"type": "json_object"}
+                )
             
             # Parse the response
             content = response.choices[0].message.content
-            result = json.loads(content)
+            result = self._parse_json_response(content)
             
             # Extract flashcards from response
             flashcards = result.get('flashcards', [])
@@ -81,46 +209,446 @@ class AIProcessor:
             # Validate and clean flashcards
             validated_flashcards = self._validate_flashcards(flashcards, difficulty_level)
             
+            if validated_flashcards:
+                self.cache.set(cache_key, validated_flashcards)
+                if embedding is not None:
+                    self.semantic_cache.set(embedding, partition, validated_flashcards)
+            
             return validated_flashcards
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse AI response as JSON: {e}")
             raise ValueError("AI response was not valid JSON")
         except Exception as e:
             logger.error(f"Error generating flashcards: {e}")
             raise Exception(f"Failed to generate flashcards: {str(e)}")
     
+    async def generate_many(
+        self,
+        tasks: List[Dict[str, Any]]
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Run generate_flashcards for several transcripts concurrently
+        
+        Args:
+            tasks: List of keyword-argument dicts accepted by generate_flashcards
+            
+        Returns:
+            List of flashcard lists, in the same order as tasks
+        """
+        return await asyncio.gather(*(self.generate_flashcards(**task) for task in tasks))
+    
+    async def aclose(self) -> None:
+        """Close the underlying HTTP connection pool"""
+        await self.client.close()
+    
+    async def generate_flashcards_long(
+        self,
+        transcript: str,
+        num_cards: int = 10,
+        difficulty_level: str = "mixed",
+        subject_focus: Optional[str] = None,
+        video_title: Optional[str] = None,
+        segments: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate flashcards covering an entire transcript (map-reduce)
+        
+        The transcript is split into token-bounded chunks, cards are
+        generated for each chunk concurrently, and the results are merged
+        with duplicate questions removed. Short transcripts take a single
+        call, exactly like generate_flashcards.
+        
+        Takes the same arguments as generate_flashcards, plus:
+            segments: Transcript segments; when given, chunks follow segment
+                boundaries and overlap slightly so no sentence is cut in half
+        
+        Returns:
+            List of flashcard dictionaries
+        """
+        chunks = self._chunk_transcript(segments) if segments else self._chunk(transcript)
+        if len(chunks) <= 1:
+            return await self.generate_flashcards(
+                transcript=transcript,
+                num_cards=num_cards,
+                difficulty_level=difficulty_level,
+                subject_focus=subject_focus,
+                video_title=video_title
+            )
+        
+        # With more chunks than cards, sample chunks evenly across the video
+        if len(chunks) > num_cards:
+            step = len(chunks) / num_cards
+            chunks = [chunks[int(i * step)] for i in range(num_cards)]
+        
+        cards_per_chunk = math.ceil(num_cards / len(chunks))
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_CHUNKS)
+        logger.info(f"Splitting transcript into {len(chunks)} chunks of {cards_per_chunk} cards")
+        
+        async def cards_for_chunk(chunk: str) -> List[Dict[str, Any]]:
+            async with semaphore:
+                return await self.generate_flashcards(
+                    transcript=chunk,
+                    num_cards=cards_per_chunk,
+                    difficulty_level=difficulty_level,
+                    subject_focus=subject_focus,
+                    video_title=video_title
+                )
+        
+        results = await asyncio.gather(
+            *(cards_for_chunk(chunk) for chunk in chunks),
+            return_exceptions=True
+        )
+        
+        failures = [r for r in results if isinstance(r, BaseException)]
+        if len(failures) == len(results):
+            raise failures[0]
+        for failure in failures:
+            logger.warning(f"Flashcard generation failed for one chunk: {failure}")
+        
+        per_chunk = [cards for cards in results if not isinstance(cards, BaseException)]
+        return self._merge_chunk_cards(per_chunk, num_cards)
+    
+    @classmethod
+    def _merge_chunk_cards(
+        cls,
+        per_chunk: List[List[Dict[str, Any]]],
+        num_cards: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Merge per-chunk cards round-robin, dropping repeated questions
+        
+        Interleaving before truncating to num_cards keeps cards from the
+        whole video rather than just its first chunks.
+        """
+        merged = []
+        seen = set()
+        for round_cards in itertools.zip_longest(*per_chunk):
+            for card in round_cards:
+                if card is None:
+                    continue
+                key = cls._normalize_question(card['question'])
+                if key in seen:
+                    continue
+                seen.add(key)
+                merged.append(card)
+        
+        return merged[:num_cards]
+    
+    def _chunk(self, text: str, max_tokens: Optional[int] = None) -> List[str]:
+        """Split text into pieces of at most max_tokens tokens"""
+        max_tokens = max_tokens or self.CHUNK_TOKENS
+        tokens = self.encoding.encode_ordinary(text)
+        return [
+            self.encoding.decode(tokens[i:i + max_tokens])
+            for i in range(0, len(tokens), max_tokens)
+        ]
+    
+    def _chunk_transcript(
+        self,
+        segments: List[Dict[str, Any]],
+        max_tokens: Optional[int] = None,
+        overlap_tokens: Optional[int] = None
+    ) -> List[str]:
+        """
+        Split transcript segments into overlapping windows of at most max_tokens
+        
+        Windows break only between segments; each one repeats the trailing
+        segments (up to overlap_tokens) of the window before it.
+        """
+        max_tokens = max_tokens or self.CHUNK_TOKENS
+        overlap_tokens = self.CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+        
+        texts = [segment['text'] for segment in segments]
+        counts = [len(tokens) for tokens in self.encoding.encode_ordinary_batch(texts)]
+        
+        chunks = []
+        window: List[int] = []
+        window_tokens = 0
+        for i, count in enumerate(counts):
+            if window and window_tokens + count > max_tokens:
+                chunks.append(' '.join(texts[j] for j in window))
+                
+                # Carry the tail of this window into the next one
+                carried: List[int] = []
+                carried_tokens = 0
+                for j in reversed(window):
+                    if carried_tokens + counts[j] > min(overlap_tokens, max_tokens - count):
+                        break
+                    carried.insert(0, j)
+                    carried_tokens += counts[j]
+                window, window_tokens = carried, carried_tokens
+            
+            window.append(i)
+            window_tokens += count
+        
+        if window:
+            chunks.append(' '.join(texts[j] for j in window))
+        return chunks
+    
+    @staticmethod
+    def _normalize_question(question: str) -> str:
+        """Normalize a question for duplicate detection"""
+        return re.sub(r'[^a-z0-9]+', ' ', question.lower()).strip()
+    
+    @property
+    def encoding(self) -> "tiktoken.Encoding":
+        """Tokenizer for the configured model"""
+        if self._encoding is None:
+            self._encoding = self._load_encoding(self.model)
+        return self._encoding
+    
+    @property
+    def transcript_token_budget(self) -> int:
+        """Transcript tokens that fit beside the system prompt and completion"""
+        if self._transcript_token_budget is None:
+            system_prompt_tokens = len(self.encoding.encode_ordinary(self.SYSTEM_PROMPT))
+            self._transcript_token_budget = min(
+                self.MAX_TRANSCRIPT_TOKENS,
+                self.CONTEXT_TOKENS - system_prompt_tokens
+                - self.MAX_OUTPUT_TOKENS - self.PROMPT_OVERHEAD_TOKENS
+            )
+        return self._transcript_token_budget
+    
+    @staticmethod
+    def _load_encoding(model: str) -> "tiktoken.Encoding":
+        """Tokenizer for the configured model, falling back for unknown models"""
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    
+    async def generate_flashcards_stream(
+        self,
+        transcript: str,
+        num_cards: int = 10,
+        difficulty_level: str = "mixed",
+        subject_focus: Optional[str] = None,
+        video_title: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate flashcards, yielding each one as soon as the model finishes it
+        
+        Takes the same arguments as generate_flashcards.
+        
+        Yields:
+            Validated flashcard dictionaries
+        """
+        user_prompt = self._create_user_prompt(
+            transcript=transcript,
+            num_cards=num_cards,
+            difficulty_level=difficulty_level,
+            subject_focus=subject_focus,
+            video_title=video_title
+        )
+        
+        # The slot is held until the stream is fully consumed
+        async with self.limiter:
+            stream = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": self._create_system_prompt()},
+                    {"role": "user", "content": user_prompt}
+                ],
+                temperature=self.temperature,
+                max_tokens=self.MAX_OUTPUT_TOKENS,
+                response_format={"type": "json_object"},
+                stream=True
+            )
+            
+            parser = _FlashcardStreamParser()
+            # Raw deltas, joined once at the end if incremental parsing fails
+            chunks: List[str] = []
+            # Cards already sent, so the fallback parse doesn't repeat them
+            yielded = 0
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                chunks.append(delta)
+                if parser is None:
+                    continue
+                try:
+                    cards = parser.feed(delta)
+                except ijson.JSONError as e:
+                    logger.warning(f"Streamed AI response was not bare JSON ({e}); parsing once complete")
+                    parser = None
+                    continue
+                for card in self._validate_flashcards(cards, difficulty_level):
+                    yielded += 1
+                    yield card
+        
+        if parser is None:
+            content = ''.join(chunks)
+            # Only a response that ends like a JSON document is worth a full parse
+            if content.rstrip()[-1:] not in ('}', ']'):
+                if yielded:
+                    logger.warning(f"Streamed AI response had trailing text after {yielded} cards")
+                    return
+                logger.error("Streamed AI response ended before the JSON was complete")
+                raise ValueError("AI response was not valid JSON")
+            try:
+                result = self._parse_json_response(content)
+            except orjson.JSONDecodeError as e:
+                if yielded:
+                    logger.warning(f"Failed to parse AI response after {yielded} cards: {e}")
+                    return
+                logger.error(f"Failed to parse AI response as JSON: {e}")
+                raise ValueError("AI response was not valid JSON")
+            cards = self._validate_flashcards(result.get('flashcards', []), difficulty_level)
+            for card in cards[yielded:]:
+                yield card
+    
+    async def generate_flashcards_batch(
+        self,
+        tasks: List[Dict[str, Any]]
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Generate flashcards for several transcripts with as few API calls as possible
+        
+        Short transcripts are packed together into a single completion; the
+        resulting calls run concurrently.
+        
+        Args:
+            tasks: List of keyword-argument dicts accepted by generate_flashcards
+            
+        Returns:
+            List of flashcard lists, in the same order as tasks
+        """
+        results: List[List[Dict[str, Any]]] = [[] for _ in tasks]
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_BATCH_CALLS)
+        
+        async def run_group(indices: List[int]) -> None:
+            async with semaphore:
+                if len(indices) == 1:
+                    results[indices[0]] = await self.generate_flashcards(**tasks[indices[0]])
+                    return
+                group_results = await self._generate_packed([tasks[i] for i in indices])
+                for i, flashcards in zip(indices, group_results):
+                    results[i] = flashcards
+        
+        await asyncio.gather(*(run_group(group) for group in self._group_tasks(tasks)))
+        return results
+    
+    def _group_tasks(self, tasks: List[Dict[str, Any]]) -> List[List[int]]:
+        """Greedily group task indices so each group fits in one completion"""
+        groups: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        current_cards = 0
+        
+        for i, task in enumerate(tasks):
+            # Rough estimate: ~4 characters per token, capped by prompt truncation
+            tokens = min(len(task['transcript']) // 4, self.transcript_token_budget)
+            cards = task.get('num_cards', 10)
+            
+            if current and (
+                len(current) >= self.MAX_TASKS_PER_CALL
+                or current_tokens + tokens > self.MAX_PROMPT_TOKENS_PER_CALL
+                or current_cards + cards > self.MAX_CARDS_PER_CALL
+            ):
+                groups.append(current)
+                current, current_tokens, current_cards = [], 0, 0
+            
+            current.append(i)
+            current_tokens += tokens
+            current_cards += cards
+        
+        if current:
+            groups.append(current)
+        return groups
+    
+    async def _generate_packed(
+        self,
+        tasks: List[Dict[str, Any]]
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Generate flashcards for several transcripts in a single API call
+        
+        Falls back to one call per task if the packed response can't be
+        parsed or doesn't contain one result set per task.
+        """
+        sections = []
+        for i, task in enumerate(tasks, 1):
+            user_prompt = self._create_user_prompt(
+                transcript=task['transcript'],
+                num_cards=task.get('num_cards', 10),
+                difficulty_level=task.get('difficulty_level', 'mixed'),
+                subject_focus=task.get('subject_focus'),
+                video_title=task.get('video_title')
+            )
+            sections.append(f"=== TASK {i} ===\n{user_prompt}")
+        
+        batch_prompt = (
+            f"Produce results for {len(tasks)} independent tasks. For each task, "
+            f"create flashcards from its transcript following its own requirements.\n\n"
+            + "\n\n".join(sections)
+            + f"\n\nRespond with a JSON object of the form "
+            f"{{\"results\": [{{\"flashcards\": [...]}}, ...]}} containing exactly "
+            f"{len(tasks)} result sets, one per task in task order, each using the "
+            f"flashcard format described above."
+        )
+        
+        try:
+            async with self.limiter:
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": self._create_system_prompt()},
+                        {"role": "user", "content": batch_prompt}
+                    ],
+                    temperature=self.temperature,
+                    max_tokens=min(self.MAX_OUTPUT_TOKENS * len(tasks), 16000),
+                    response_format={"type": "json_object"}
+                )
+            
+            result = self._parse_json_response(response.choices[0].message.content)
+            result_sets = result.get('results')
+            if not isinstance(result_sets, list) or len(result_sets) != len(tasks):
+                raise ValueError(f"expected {len(tasks)} result sets")
+            
+            return [
+                self._validate_flashcards(
+                    result_set.get('flashcards', []) if isinstance(result_set, dict) else [],
+                    task.get('difficulty_level', 'mixed')
+                )
+                for result_set, task in zip(result_sets, tasks)
+            ]
+            
+        except (orjson.JSONDecodeError, ValueError) as e:
+            logger.warning(f"Batched AI response unusable ({e}); generating tasks individually")
+            return await self.generate_many(tasks)
+        except Exception as e:
+            logger.error(f"Error generating batched flashcards: {e}")
+            raise Exception(f"Failed to generate flashcards: {str(e)}")
+    
+    @staticmethod
+    def _parse_json_response(content: str) -> Dict[str, Any]:
+        """
+        Parse the model's JSON response
+        
+        JSON mode normally guarantees a bare object, so this is a single
+        orjson call. Only if that fails do we fall back to the outermost
+        {...} span, in case the model wrapped the object in extra text.
+        
+        Raises:
+            orjson.JSONDecodeError: If no JSON object can be recovered
+        """
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            start = content.find('{')
+            end = content.rfind('}')
+            if start == -1 or end <= start:
+                raise
+            logger.warning("AI response was not bare JSON; recovering outermost object")
+            return orjson.loads(content[start:end + 1])
+    
     def _create_system_prompt(self) -> str:
         """Create the system prompt for flashcard generation"""
-        return """You are an expert educational content creator specializing in creating effective flashcards for learning and retention.
-
-Your task is to analyze video transcripts and create high-quality flashcards that:
-1. Test key concepts and important information from the content
-2. Are clear, concise, and unambiguous
-3. Follow spaced repetition best practices
-4. Include a mix of factual recall, conceptual understanding, and application questions
-5. Have appropriate difficulty levels
-
-You must respond with valid JSON in the following format:
-{
-    "flashcards": [
-        {
-            "question": "Clear, specific question",
-            "answer": "Concise, accurate answer",
-            "difficulty": "easy|medium|hard",
-            "topic": "Main topic or category",
-            "explanation": "Optional additional context or explanation"
-        }
-    ]
-}
-
-Guidelines:
-- Questions should be specific and have clear answers
-- Avoid yes/no questions unless they test important facts
-- Include 'why' and 'how' questions for deeper understanding
-- Answers should be concise but complete
-- Add explanations for complex topics
-- Ensure factual accuracy based on the transcript content"""
+        return self.SYSTEM_PROMPT
     
     def _create_user_prompt(
         self,
@@ -131,10 +659,10 @@ Guidelines:
         video_title: Optional[str]
     ) -> str:
         """Create the user prompt with transcript and requirements"""
-        # Truncate transcript if too long (to stay within token limits)
-        max_transcript_length = 8000
-        if len(transcript) > max_transcript_length:
-            transcript = transcript[:max_transcript_length] + "..."
+        # Truncate transcript by tokens if too long (to stay within token limits)
+        tokens = self.encoding.encode_ordinary(transcript)
+        if len(tokens) > self.transcript_token_budget:
+            transcript = self.encoding.decode(tokens[:self.transcript_token_budget]) + "..."
         
         prompt = f"""Create {num_cards} flashcards from the following video transcript.
 
@@ -185,31 +713,40 @@ Return the flashcards as valid JSON."""
         validated = []
         
         for card in flashcards:
-            # Ensure required fields exist
-            if not card.get('question') or not card.get('answer'):
+            if not isinstance(card, dict):
+                continue
+            
+            # Ensure required fields exist and are text
+            question = card.get('question')
+            answer = card.get('answer')
+            if not isinstance(question, str) or not isinstance(answer, str):
+                continue
+            question = question.strip()
+            answer = answer.strip()
+            
+            # Skip cards with very short questions or answers
+            if len(question) < 10 or len(answer) < 3:
                 continue
             
             # Set difficulty if not provided or invalid
-            difficulty = card.get('difficulty', 'medium').lower()
+            difficulty = card.get('difficulty', 'medium')
+            difficulty = difficulty.lower() if isinstance(difficulty, str) else None
             if difficulty not in ['easy', 'medium', 'hard']:
                 if requested_difficulty == 'mixed':
                     difficulty = 'medium'
                 else:
                     difficulty = requested_difficulty
             
-            validated_card = {
-                'question': str(card['question']).strip(),
-                'answer': str(card['answer']).strip(),
-                'difficulty': difficulty,
-                'topic': card.get('topic', 'General'),
-                'explanation': card.get('explanation', None)
-            }
-            
-            # Skip cards with very short questions or answers
-            if len(validated_card['question']) < 10 or len(validated_card['answer']) < 3:
-                continue
+            topic = card.get('topic')
+            explanation = card.get('explanation')
             
-            validated.append(validated_card)
+            validated.append({
+                'question': question,
+                'answer': answer,
+                'difficulty': difficulty,
+                'topic': topic if isinstance(topic, str) else 'General',
+                'explanation': explanation if isinstance(explanation, str) else None
+            })
         
         return validated
     
@@ -247,12 +784,9 @@ Return the flashcards as valid JSON."""
         Returns:
             Dictionary of flashcards grouped by topic
         """
-        categorized = {}
+        categorized = defaultdict(list)
         
         for card in flashcards:
-            topic = card.get('topic', 'General')
-            if topic not in categorized:
-                categorized[topic] = []
-            categorized[topic].append(card)
+            categorized[card.get('topic', 'General')].append(card)
         
-        return categorized
\ No newline at end of file
+        return dict(categorized)
\ No newline at end of file
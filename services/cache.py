@@ -0,0 +1,166 @@
+"""
+Caching for YouTube metadata and transcripts
+
+An in-process TTL cache sits in front of a persistent disk cache, so
+repeat requests survive restarts and are shared between worker processes.
+"""
+import os
+import asyncio
+import logging
+from typing import Any, Hashable, Optional
+from cachetools import TTLCache
+from diskcache import Cache
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTTLCache:
+    """LRU cache with per-entry expiry, safe to share between coroutines"""
+
+    def __init__(self, maxsize: int = 2000, ttl: float = 86400):
+        """
+        Args:
+            maxsize: Maximum number of entries before LRU eviction
+            ttl: Time-to-live of each entry in seconds
+        """
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = asyncio.Lock()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._cache
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    async def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing/expired"""
+        async with self._lock:
+            return self._cache.get(key, default)
+
+    async def set(self, key: Hashable, value: Any) -> None:
+        """Store a value under key"""
+        async with self._lock:
+            self._cache[key] = value
+
+    async def delete_video(self, video_id: str) -> int:
+        """
+        Remove every entry belonging to a video
+
+        Keys are either the video ID itself or a tuple starting with it.
+
+        Returns:
+            Number of entries removed
+        """
+        async with self._lock:
+            keys = [
+                key for key in list(self._cache.keys())
+                if key == video_id or (isinstance(key, tuple) and key and key[0] == video_id)
+            ]
+            for key in keys:
+                self._cache.pop(key, None)
+            return len(keys)
+
+    async def clear(self) -> None:
+        """Remove all entries"""
+        async with self._lock:
+            self._cache.clear()
+
+
+class AsyncDiskCache:
+    """Persistent cache with per-entry expiry; disk I/O runs off the event loop"""
+
+    def __init__(self, directory: str, ttl: float = 604800):
+        """
+        Args:
+            directory: Directory holding the cache database
+            ttl: Time-to-live of each entry in seconds
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self._cache: Optional[Cache] = None
+
+    @property
+    def cache(self) -> Cache:
+        """Underlying diskcache.Cache, opened on first use"""
+        if self._cache is None:
+            self._cache = Cache(self.directory)
+        return self._cache
+
+    async def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing/expired"""
+        return await asyncio.to_thread(self.cache.get, key, default)
+
+    async def set(self, key: Hashable, value: Any) -> None:
+        """Store a value under key"""
+        await asyncio.to_thread(self.cache.set, key, value, expire=self.ttl)
+
+    async def delete_video(self, video_id: str) -> int:
+        """Remove every entry whose key is a tuple starting with video_id"""
+        def delete() -> int:
+            keys = [
+                key for key in self.cache.iterkeys()
+                if isinstance(key, tuple) and key and key[0] == video_id
+            ]
+            for key in keys:
+                self.cache.delete(key)
+            return len(keys)
+
+        return await asyncio.to_thread(delete)
+
+    async def clear(self) -> int:
+        """Remove all entries"""
+        return await asyncio.to_thread(self.cache.clear)
+
+    def close(self) -> None:
+        """Close the cache database"""
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+
+
+CACHE_MAXSIZE = int(os.getenv("CACHE_MAXSIZE", 2000))
+CACHE_TTL = int(os.getenv("CACHE_TTL", 86400))
+
+# Keyed by video_id
+metadata_cache = AsyncTTLCache(maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL)
+
+# Raw backend results, keyed by (video_id, language); shared by every
+# preserve_formatting variant and kept even when the metadata fetch failed
+fetched_transcript_cache = AsyncTTLCache(maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL)
+
+# Keyed by (video_id, language, preserve_formatting)
+transcript_cache = AsyncTTLCache(maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL)
+
+# Keyed by (video_id, language); holds {'metadata', 'transcript'} as fetched
+disk_cache = AsyncDiskCache(
+    os.getenv("TRANSCRIPT_CACHE_DIR", "./.transcript_cache"),
+    ttl=int(os.getenv("DISK_CACHE_TTL", 604800))
+)
+
+
+async def clear_cache(video_id: Optional[str] = None) -> int:
+    """
+    Drop cached metadata and transcripts, in memory and on disk
+
+    Args:
+        video_id: Only drop entries for this video; drop everything if None
+
+    Returns:
+        Number of entries removed
+    """
+    if video_id is None:
+        removed = len(metadata_cache) + len(fetched_transcript_cache) + len(transcript_cache)
+        await metadata_cache.clear()
+        await fetched_transcript_cache.clear()
+        await transcript_cache.clear()
+        removed += await disk_cache.clear()
+    else:
+        removed = (
+            await metadata_cache.delete_video(video_id)
+            + await fetched_transcript_cache.delete_video(video_id)
+            + await transcript_cache.delete_video(video_id)
+            + await disk_cache.delete_video(video_id)
+        )
+
+    logger.info(f"Cleared {removed} cache entries" + (f" for video: {video_id}" if video_id else ""))
+    return removed
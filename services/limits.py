@@ -0,0 +1,44 @@
+"""
+Concurrency limits for outbound calls to OpenAI and YouTube
+"""
+import asyncio
+import logging
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrencyLimiter:
+    """Async semaphore that also records how often callers had to wait"""
+
+    def __init__(self, name: str, limit: int):
+        """
+        Args:
+            name: Downstream service name, used in logs and stats
+            limit: Maximum number of concurrent calls
+        """
+        self.name = name
+        self.limit = limit
+        self.in_flight = 0
+        self.queued_total = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def __aenter__(self) -> "ConcurrencyLimiter":
+        if self._semaphore.locked():
+            self.queued_total += 1
+            logger.debug(f"{self.name} concurrency limit ({self.limit}) reached; waiting for a slot")
+        await self._semaphore.acquire()
+        self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current usage counters"""
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued_total": self.queued_total
+        }
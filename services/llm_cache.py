@@ -0,0 +1,189 @@
+"""
+Content-addressed cache for OpenAI completion results
+"""
+import os
+import time
+import hashlib
+import logging
+from typing import TYPE_CHECKING, Any, Dict, Hashable, List, Optional, Protocol
+import orjson
+from cachetools import LRUCache
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(Protocol):
+    """Storage used by LLMCache; values expire after ttl seconds"""
+
+    def get(self, key: str) -> Optional[Any]: ...
+
+    def set(self, key: str, value: Any, ttl: float) -> None: ...
+
+
+class InMemoryLRU:
+    """Process-local LRU backend with per-entry expiry"""
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        Args:
+            maxsize: Maximum number of entries before LRU eviction
+        """
+        self._cache = LRUCache(maxsize=maxsize)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._cache.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._cache[key] = (time.monotonic() + ttl, value)
+
+
+class LLMCache:
+    """Exact-match cache of completion results keyed by the request payload"""
+
+    def __init__(self, backend: CacheBackend, ttl: float = 86400):
+        """
+        Args:
+            backend: Storage for cached results
+            ttl: Time-to-live of each entry in seconds
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(model: str, messages: List[Dict[str, str]], temperature: float, **params: Any) -> str:
+        """SHA-256 of everything that determines the completion"""
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            **params
+        }
+        return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached result for key, or None on a miss"""
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a result under key"""
+        self.backend.set(key, value, self.ttl)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters"""
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class SemanticCache:
+    """
+    Near-duplicate lookup of completion results by embedding similarity
+    
+    Entries are partitioned by the generation parameters so a transcript
+    cached for 5 easy cards never answers a request for 20 hard ones.
+    
+    Requires numpy, which is imported lazily since the cache is off by default.
+    """
+
+    EMBEDDING_MODEL = "text-embedding-3-small"
+    MAX_EMBED_CHARS = 4000
+
+    def __init__(self, threshold: float = 0.95, maxsize: int = 1024, ttl: float = 86400):
+        """
+        Args:
+            threshold: Minimum cosine similarity for a hit
+            maxsize: Maximum entries per parameter partition (oldest evicted first)
+            ttl: Time-to-live of each entry in seconds
+        """
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # partition -> (unit vectors stacked row-wise, [(expires_at, value)])
+        self._partitions: Dict[Hashable, tuple] = {}
+
+    async def embed(self, client: Any, text: str) -> "np.ndarray":
+        """Embed text with the OpenAI embeddings API and L2-normalize it"""
+        import numpy as np
+        
+        response = await client.embeddings.create(
+            model=self.EMBEDDING_MODEL,
+            input=text[:self.MAX_EMBED_CHARS]
+        )
+        vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def get(self, embedding: "np.ndarray", partition: Hashable) -> Optional[Any]:
+        """Return the most similar live entry above the threshold, or None"""
+        import numpy as np
+        
+        matrix, entries = self._partitions.get(partition, (None, []))
+        if matrix is not None:
+            now = time.monotonic()
+            scores = matrix @ embedding
+            for index in np.argsort(scores)[::-1]:
+                if scores[index] < self.threshold:
+                    break
+                expires_at, value = entries[index]
+                if expires_at >= now:
+                    self.hits += 1
+                    return value
+        self.misses += 1
+        return None
+
+    def set(self, embedding: "np.ndarray", partition: Hashable, value: Any) -> None:
+        """Store a result under its embedding"""
+        import numpy as np
+        
+        matrix, entries = self._partitions.get(partition, (None, []))
+        row = embedding[np.newaxis, :]
+        matrix = row if matrix is None else np.vstack([matrix, row])
+        entries = entries + [(time.monotonic() + self.ttl, value)]
+        if len(entries) > self.maxsize:
+            matrix = matrix[-self.maxsize:]
+            entries = entries[-self.maxsize:]
+        self._partitions[partition] = (matrix, entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters"""
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def create_llm_cache() -> LLMCache:
+    """Build the default in-memory cache from environment settings"""
+    return LLMCache(
+        InMemoryLRU(maxsize=int(os.getenv("LLM_CACHE_MAXSIZE", 1024))),
+        ttl=int(os.getenv("LLM_CACHE_TTL", 86400))
+    )
+
+
+def create_semantic_cache() -> Optional[SemanticCache]:
+    """Build the semantic cache if LLM_SEMANTIC_CACHE is enabled"""
+    if os.getenv("LLM_SEMANTIC_CACHE", "false").lower() != "true":
+        return None
+    try:
+        import numpy
+    except ImportError:
+        logger.warning("LLM_SEMANTIC_CACHE is enabled but numpy is not installed; semantic cache disabled")
+        return None
+    return SemanticCache(
+        threshold=float(os.getenv("LLM_SEMANTIC_THRESHOLD", 0.95)),
+        maxsize=int(os.getenv("LLM_CACHE_MAXSIZE", 1024)),
+        ttl=int(os.getenv("LLM_CACHE_TTL", 86400))
+    )
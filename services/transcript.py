@@ -3,107 +3,568 @@ YouTube Transcript Extraction Service
 Fixed version with correct YouTubeTranscriptApi usage
 """
 import re
+import html
 import json
-import requests
-from typing import Optional, Dict, Any, List
+import time
+import functools
+import asyncio
+import httpx
+import orjson
+from cachetools import TTLCache
+from typing import Optional, Dict, Any, List, Pattern, Protocol, Tuple, Union
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import (
     NoTranscriptFound,
+    TooManyRequests,
     TranscriptsDisabled,
-    VideoUnavailable
+    VideoUnavailable,
+    YouTubeRequestFailed
 )
-from bs4 import BeautifulSoup
+from tenacity import (
+    before_sleep_log,
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential_jitter
+)
+import os
 import logging
 
+from .cache import disk_cache, fetched_transcript_cache, metadata_cache, transcript_cache
+from .limits import ConcurrencyLimiter
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+}
+
+# Transient request failures are retried with exponential backoff and
+# jitter. Throttling (429) is not: it surfaces immediately so the backend
+# cascade can put the API backend on cooldown and move on.
+_retry_transient = retry(
+    stop=stop_after_attempt(5),
+    wait=wait_exponential_jitter(initial=1, max=30),
+    retry=retry_if_exception_type(YouTubeRequestFailed),
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+    reraise=True
+)
+
+
+# Targeted extractors for the few tags we need from the ~1MB watch page;
+# avoids building a full DOM tree
+_TITLE_RE = re.compile(r'<title>([^<]*)</title>', re.IGNORECASE)
+_META_RE = re.compile(r'<meta[^>]+name="(author|description)"[^>]+content="([^"]*)"', re.IGNORECASE)
+
+# Video ID from a youtu.be, watch?v=, embed/, v/ or shorts/ URL, or a bare
+# ID, in one scan
+_VIDEO_ID_RE = re.compile(
+    r'(?:youtu\.be/|[?&]v=|/(?:embed|v|shorts)/)([0-9A-Za-z_-]{11})'
+    r'|^([0-9A-Za-z_-]{11})$'
+)
+
+# Inline player config embedded in the watch page
+_PLAYER_RESPONSE_MARKER = 'ytInitialPlayerResponse'
+# Anchored at the end of the marker: only the " = " before the opening brace
+_ASSIGNMENT_RE = re.compile(r'\s*=\s*(?=\{)')
+# The same assignment in the raw download, so streaming skips earlier
+# mentions of the marker (e.g. window["ytInitialPlayerResponse"] = null)
+_PLAYER_RESPONSE_ASSIGNMENT = re.compile(rb'ytInitialPlayerResponse\s*=\s*\{')
+# Bytes re-scanned at a chunk seam when waiting for a regex marker
+_PATTERN_LOOKBACK = 256
+
+# Decodes just the object at an offset and reports where it ended
+_JSON_DECODER = json.JSONDecoder()
+
+# Transcript cleanup
+_WHITESPACE_RE = re.compile(r'\s+')
+_ANNOTATION_RE = re.compile(r'\[.*?\]|\(.*?\)')
+
+# Keep-alive pool shared by every request to YouTube
+HTTP_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=60
+)
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """
+    Create a pooled HTTP client configured for YouTube scraping
+    
+    HTTP/2 lets the watch page and caption requests to www.youtube.com
+    share one TCP/TLS connection.
+    """
+    return httpx.AsyncClient(
+        headers=DEFAULT_HEADERS,
+        timeout=10,
+        follow_redirects=True,
+        transport=httpx.AsyncHTTPTransport(limits=HTTP_LIMITS, retries=3, http2=True)
+    )
+
+
+_shared_client: Optional[httpx.AsyncClient] = None
+
+
+def get_shared_http_client() -> httpx.AsyncClient:
+    """Return the module-wide HTTP client, creating it if needed"""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = create_http_client()
+    return _shared_client
+
+
+async def aclose_shared_http_client() -> None:
+    """
+    Close the module-wide HTTP client
+    
+    Call once no service needs it any more, e.g. at the end of each
+    asyncio.run in a script; the next get_shared_http_client() call
+    creates a fresh client.
+    """
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
+
+
+def _parse_json3(caption_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Convert a YouTube json3 caption payload into transcript segments"""
+    return [
+        {
+            'text': ''.join([seg['utf8'] for seg in event['segs'] if 'utf8' in seg]),
+            'start': event.get('tStartMs', 0) / 1000,
+            'duration': event.get('dDurationMs', 0) / 1000
+        }
+        for event in caption_data.get('events', [])
+        if 'segs' in event
+    ]
+
+
+def _parse_player_response(page_text: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the ytInitialPlayerResponse object embedded in a watch page
+    
+    Locates the assignment with str.find and decodes only the object that
+    follows it with raw_decode; no unanchored regex over the ~1MB page.
+    
+    Raises:
+        json.JSONDecodeError: If the object is malformed
+    """
+    index = page_text.find(_PLAYER_RESPONSE_MARKER)
+    while index != -1:
+        position = index + len(_PLAYER_RESPONSE_MARKER)
+        assignment = _ASSIGNMENT_RE.match(page_text, position)
+        if assignment:
+            player_response, _ = _JSON_DECODER.raw_decode(page_text, assignment.end())
+            return player_response
+        index = page_text.find(_PLAYER_RESPONSE_MARKER, position)
+    return None
+
+
+class BackendThrottled(Exception):
+    """Raised by a transcript backend when YouTube is rate limiting it"""
+
+
+class TranscriptBackend(Protocol):
+    """A source of YouTube transcripts"""
+    
+    name: str
+    
+    async def fetch(self, video_id: str, language: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a transcript
+        
+        Returns:
+            Dict with 'segments', 'language' and 'is_generated', or None if
+            this backend has no transcript for the video
+            
+        Raises:
+            BackendThrottled: If YouTube is rate limiting this backend
+        """
+        ...
+
+
+class WatchBackend:
+    """Scrape caption tracks from the watch page's player response"""
+    
+    name = "watch"
+    
+    def __init__(self, service: "TranscriptService"):
+        self.service = service
+    
+    async def fetch(self, video_id: str, language: str) -> Optional[Dict[str, Any]]:
+        return await self.service.get_transcript_with_beautifulsoup_fallback(video_id, language)
+
+
+class YtdlpBackend:
+    """Fetch caption tracks through yt-dlp, rotating YouTube player clients"""
+    
+    name = "ytdlp"
+    DEFAULT_CLIENTS = ["android", "android_vr", "tv_embedded", "mweb", "web", "ios"]
+    
+    def __init__(self, service: "TranscriptService", clients: Optional[List[str]] = None):
+        self.service = service
+        self.clients = clients or self.DEFAULT_CLIENTS
+    
+    async def fetch(self, video_id: str, language: str) -> Optional[Dict[str, Any]]:
+        try:
+            # Imported lazily: yt-dlp is slow to import and only needed
+            # when the watch-page backend fails
+            import yt_dlp
+        except ImportError:
+            logger.debug("yt-dlp not installed, skipping ytdlp backend")
+            return None
+        
+        for client in self.clients:
+            try:
+                async with self.service.limiter:
+                    info = await asyncio.to_thread(self._extract_info, yt_dlp, video_id, client)
+            except yt_dlp.utils.DownloadError as e:
+                if '429' in str(e):
+                    raise BackendThrottled(f"yt-dlp throttled for video: {video_id}")
+                logger.debug(f"yt-dlp client {client} failed for {video_id}: {e}")
+                continue
+            
+            # Extraction succeeded, so another client would see the same
+            # captions; only a DownloadError is worth rotating clients on
+            track = self._pick_track(info, language)
+            if not track:
+                return None
+            
+            language_code, url, is_generated = track
+            response = await self.service.http_get(url)
+            if response.status_code == 429:
+                raise BackendThrottled(f"Caption track throttled for video: {video_id}")
+            if response.status_code != 200 or not response.content:
+                return None
+            
+            try:
+                segments = _parse_json3(orjson.loads(response.content))
+            except orjson.JSONDecodeError:
+                logger.debug(f"yt-dlp caption track for {video_id} is not valid JSON")
+                return None
+            if not segments:
+                return None
+            
+            logger.info(f"Got transcript via yt-dlp ({client} client)")
+            return {
+                'segments': segments,
+                'language': language_code,
+                'is_generated': is_generated
+            }
+        
+        return None
+    
+    @staticmethod
+    def _extract_info(yt_dlp, video_id: str, client: str) -> Dict[str, Any]:
+        """Run yt-dlp metadata extraction with a single player client"""
+        options = {
+            'quiet': True,
+            'no_warnings': True,
+            'skip_download': True,
+            'extractor_args': {'youtube': {'player_client': [client]}}
+        }
+        with yt_dlp.YoutubeDL(options) as ydl:
+            return ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
+    
+    @staticmethod
+    def _pick_track(info: Dict[str, Any], language: str) -> Optional[tuple]:
+        """
+        Pick a json3 caption track, preferring manual captions in the
+        requested language, then auto-generated ones, then any manual track
+        
+        Returns:
+            (language_code, url, is_generated) or None
+        """
+        def json3_url(formats):
+            for fmt in formats:
+                if fmt.get('ext') == 'json3' and fmt.get('url'):
+                    return fmt['url']
+            return None
+        
+        for key, is_generated in (('subtitles', False), ('automatic_captions', True)):
+            for code, formats in (info.get(key) or {}).items():
+                if code == language or code.startswith(f"{language}-"):
+                    url = json3_url(formats)
+                    if url:
+                        return code, url, is_generated
+        
+        for code, formats in (info.get('subtitles') or {}).items():
+            url = json3_url(formats)
+            if url:
+                return code, url, False
+        
+        return None
+
+
+class ApiBackend:
+    """Fetch transcripts through youtube-transcript-api (the timedtext endpoint)"""
+    
+    name = "api"
+    
+    def __init__(self, service: "TranscriptService"):
+        self.service = service
+    
+    async def fetch(self, video_id: str, language: str) -> Optional[Dict[str, Any]]:
+        try:
+            return await self.service.get_transcript_from_api(video_id, language)
+        except TooManyRequests:
+            raise BackendThrottled(f"Transcript API throttled for video: {video_id}")
+
+
+class AutoBackend:
+    """
+    Try each backend in order, skipping any that YouTube is throttling
+    
+    A throttled backend is put on cooldown; the cooldown doubles each time
+    it is throttled again and resets after a successful call. Each backend
+    also has its own concurrency limit.
+    """
+    
+    name = "auto"
+    BASE_COOLDOWN = 60
+    MAX_COOLDOWN = 3600
+    
+    def __init__(self, backends: List[TranscriptBackend], max_concurrency: int = 8):
+        self.backends = backends
+        self._semaphores = {b.name: asyncio.Semaphore(max_concurrency) for b in backends}
+        self._cooldown = {b.name: self.BASE_COOLDOWN for b in backends}
+        self._cooldown_until = {b.name: 0.0 for b in backends}
+    
+    async def fetch(self, video_id: str, language: str) -> Optional[Dict[str, Any]]:
+        for backend in self.backends:
+            name = backend.name
+            if time.monotonic() < self._cooldown_until[name]:
+                logger.info(f"Skipping {name} transcript backend (cooling down)")
+                continue
+            
+            try:
+                async with self._semaphores[name]:
+                    result = await backend.fetch(video_id, language)
+            except BackendThrottled as e:
+                delay = self._cooldown[name]
+                self._cooldown_until[name] = time.monotonic() + delay
+                self._cooldown[name] = min(delay * 2, self.MAX_COOLDOWN)
+                logger.warning(f"{e}; cooling down {name} backend for {delay}s")
+                continue
+            except Exception as e:
+                logger.error(f"{name} transcript backend failed: {e}")
+                continue
+            
+            self._cooldown[name] = self.BASE_COOLDOWN
+            if result:
+                logger.info(f"Got transcript for {video_id} from {name} backend")
+                return result
+        
+        return None
+
 
 class TranscriptService:
     """Service for extracting transcripts and metadata from YouTube videos"""
     
-    def __init__(self):
-        """Initialize the service with session for web scraping"""
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        })
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize the service
+        
+        Args:
+            client: HTTP client to use, closed by aclose(); defaults to the
+                module-wide shared client, which aclose() leaves open
+        """
+        self._client = client
+        self._owns_client = client is not None
+        # Watch-page downloads by video ID, shared by metadata extraction and
+        # the watch-page transcript backend (briefly kept after completion)
+        self._watch_pages: TTLCache = TTLCache(maxsize=32, ttl=60)
+        self.limiter = ConcurrencyLimiter(
+            "youtube",
+            int(os.getenv("YOUTUBE_MAX_CONCURRENCY", 50))
+        )
+        self.backend = AutoBackend([
+            WatchBackend(self),
+            YtdlpBackend(self),
+            ApiBackend(self)
+        ])
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client used for web scraping"""
+        if self._client is None:
+            self._client = get_shared_http_client()
+        return self._client
+    
+    @client.setter
+    def client(self, client: httpx.AsyncClient) -> None:
+        self._client = client
+        self._owns_client = True
+    
+    async def http_get(self, url: str) -> httpx.Response:
+        """GET a URL, bounded by the YouTube concurrency limit"""
+        async with self.limiter:
+            return await self.client.get(url)
+    
+    async def warm_up(self) -> None:
+        """Open a pooled connection to youtube.com so the first request finds it ready"""
+        try:
+            async with self.limiter:
+                await self.client.head("https://www.youtube.com/")
+            logger.info("YouTube connection pool warmed up")
+        except httpx.HTTPError as e:
+            logger.warning(f"Could not pre-warm YouTube connection: {e}")
+    
+    async def http_get_until(
+        self,
+        url: str,
+        *markers: Union[bytes, Pattern[bytes]],
+        chunk_size: int = 65536
+    ) -> str:
+        """
+        GET a page, downloading only until the given markers have all arrived
+        
+        Markers (literal bytes or compiled bytes patterns) are matched in
+        order, each searched for after the previous one; the rest of the
+        body is never transferred.
+        
+        Raises:
+            httpx.HTTPStatusError: If the response status is not 2xx
+        """
+        buffer = bytearray()
+        pending = list(markers)
+        position = 0  # where the search for pending[0] resumes
+        async with self.limiter:
+            async with self.client.stream('GET', url) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(chunk_size):
+                    buffer += chunk
+                    while pending:
+                        marker = pending[0]
+                        if isinstance(marker, bytes):
+                            index = buffer.find(marker, position)
+                            end = index + len(marker)
+                            lookback = len(marker)
+                        else:
+                            match = marker.search(buffer, position)
+                            index, end = (match.start(), match.end()) if match else (-1, -1)
+                            lookback = _PATTERN_LOOKBACK
+                        if index == -1:
+                            # Re-check the seam in case the marker straddles chunks
+                            position = max(position, len(buffer) - lookback + 1)
+                            break
+                        position = end
+                        pending.pop(0)
+                    if not pending:
+                        break
+                encoding = response.charset_encoding or 'utf-8'
+        
+        return buffer.decode(encoding, errors='replace')
+    
+    async def get_watch_page(self, video_id: str) -> str:
+        """
+        Download a watch page up to the end of its player response script
+        
+        Concurrent and back-to-back callers for the same video share one
+        request, so metadata extraction and the watch-page backend don't
+        fetch the page twice.
+        
+        Raises:
+            httpx.HTTPStatusError: If the response status is not 2xx
+        """
+        task = self._watch_pages.get(video_id)
+        if task is None:
+            task = asyncio.ensure_future(self.http_get_until(
+                f"https://www.youtube.com/watch?v={video_id}",
+                _PLAYER_RESPONSE_ASSIGNMENT,
+                b'</script>'
+            ))
+            self._watch_pages[video_id] = task
+            
+            def forget_failure(done: asyncio.Future) -> None:
+                if done.cancelled() or done.exception() is not None:
+                    self._watch_pages.pop(video_id, None)
+            
+            task.add_done_callback(forget_failure)
+        elif task.done():
+            return task.result()
+        
+        # Shielded so one caller being cancelled doesn't cancel the others' download
+        return await asyncio.shield(task)
+    
+    async def aclose(self) -> None:
+        """Close the HTTP client if this service owns it (the shared client is left open)"""
+        if self._client is not None and self._owns_client:
+            await self._client.aclose()
+        self._client = None
+        self._owns_client = False
     
     @staticmethod
+    @functools.lru_cache(maxsize=4096)
     def extract_video_id(url: str) -> Optional[str]:
         """
         Extract video ID from various YouTube URL formats
+        
+        Results are memoized; the same URL is parsed several times per request.
         """
-        # Handle short URLs (youtu.be)
-        if 'youtu.be' in url:
-            match = re.search(r'youtu\.be/([0-9A-Za-z_-]{11})', url)
-            if match:
-                return match.group(1)
-        
-        # Handle standard YouTube URLs
-        if 'youtube.com' in url:
-            if 'v=' in url:
-                match = re.search(r'v=([0-9A-Za-z_-]{11})', url)
-                if match:
-                    return match.group(1)
-        
-        # Handle embed URLs
-        if 'embed/' in url:
-            match = re.search(r'embed/([0-9A-Za-z_-]{11})', url)
-            if match:
-                return match.group(1)
-        
-        # If it's already just the video ID
-        if re.match(r'^[0-9A-Za-z_-]{11}$', url):
-            return url
-            
-        return None
+        match = _VIDEO_ID_RE.search(url)
+        return (match.group(1) or match.group(2)) if match else None
     
-    def get_video_metadata(self, video_url: str) -> Dict[str, Any]:
+    async def get_video_metadata(self, video_url: str) -> Dict[str, Any]:
         """
-        Use BeautifulSoup to get video title and metadata from YouTube page
+        Get video title and metadata from the YouTube watch page
         """
         video_id = self.extract_video_id(video_url)
         if not video_id:
             raise ValueError(f"Could not extract video ID from URL: {video_url}")
         
+        cached = await metadata_cache.get(video_id)
+        if cached is not None:
+            return cached
+        
         # Construct full URL
         full_url = f"https://www.youtube.com/watch?v={video_id}"
         
         try:
-            # Get the page using requests
+            # Get the page without blocking the event loop; the download is
+            # shared with the watch-page transcript backend
             logger.info(f"Fetching page for video: {video_id}")
-            page = self.session.get(full_url, timeout=10)
-            page.raise_for_status()
-            
-            # Use BeautifulSoup to parse the page
-            soup = BeautifulSoup(page.text, 'html.parser')
+            page_text = await self.get_watch_page(video_id)
             
             # Get the title from the page
-            title = soup.find('title')
-            video_title = title.text.replace(' - YouTube', '') if title else 'Unknown Title'
+            title = _TITLE_RE.search(page_text)
+            if title:
+                video_title = html.unescape(title.group(1))
+                
+                # Channel name and description come from the author/description
+                # meta tags, collected in a single pass over the page
+                meta = {}
+                for match in _META_RE.finditer(page_text):
+                    meta.setdefault(match.group(1).lower(), html.unescape(match.group(2)))
+                    if len(meta) == 2:
+                        break
+            else:
+                # Markup the regexes don't recognise; parse the page properly
+                video_title, meta = self._parse_metadata_html(page_text)
             
             # Try to get additional metadata
             metadata = {
                 'video_id': video_id,
-                'video_title': video_title,
+                'video_title': video_title.replace(' - YouTube', '') if video_title else 'Unknown Title',
                 'video_url': full_url
             }
             
-            # Try to extract channel name
-            channel_meta = soup.find('meta', {'name': 'author'})
-            if channel_meta:
-                metadata['channel_name'] = channel_meta.get('content', '')
-            
-            # Try to extract description
-            description_meta = soup.find('meta', {'name': 'description'})
-            if description_meta:
-                metadata['description'] = description_meta.get('content', '')[:500]
+            if meta.get('author'):
+                metadata['channel_name'] = meta['author']
+            if meta.get('description'):
+                metadata['description'] = meta['description'][:500]
             
+            # A page without a title is a consent/interstitial or throttled
+            # response; don't pin the placeholder for the whole TTL
+            if video_title:
+                await metadata_cache.set(video_id, metadata)
             return metadata
             
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Error fetching YouTube page: {e}")
             # Return minimal metadata if page fetch fails
             return {
@@ -112,78 +573,93 @@ class TranscriptService:
                 'video_url': full_url
             }
     
-    def get_transcript_from_api(self, video_id: str, language: str = 'en') -> Optional[Dict]:
+    @staticmethod
+    def _parse_metadata_html(page_text: str) -> Tuple[Optional[str], Dict[str, str]]:
+        """
+        Slow path for get_video_metadata: extract the title and author/description
+        meta tags with a real HTML parser
+        
+        Uses selectolax's lexbor (C) parser when installed, otherwise BeautifulSoup.
+        """
+        meta = {}
+        
+        # Imported lazily: only needed when the regex extractors miss
+        try:
+            from selectolax.lexbor import LexborHTMLParser
+        except ImportError:
+            LexborHTMLParser = None
+        
+        # Each parser walks the tree once, collecting the title and meta tags
+        title = None
+        if LexborHTMLParser is not None:
+            tree = LexborHTMLParser(page_text)
+            for node in tree.css('title, meta[name]'):
+                if node.tag == 'title':
+                    if title is None:
+                        title = node.text()
+                    continue
+                name = node.attributes.get('name')
+                content = node.attributes.get('content')
+                if name in ('author', 'description') and content:
+                    meta.setdefault(name, content)
+            return title, meta
+        
+        from bs4 import BeautifulSoup
+        
+        soup = BeautifulSoup(page_text, 'html.parser')
+        for tag in soup.find_all(['title', 'meta']):
+            if tag.name == 'title':
+                if title is None:
+                    title = tag.get_text()
+                continue
+            name = tag.get('name')
+            if name in ('author', 'description') and tag.get('content'):
+                meta.setdefault(name, tag['content'])
+        
+        return title, meta
+    
+    @_retry_transient
+    async def _api_call(self, func, *args):
+        """
+        Run a blocking youtube-transcript-api call in a worker thread
+        
+        The YouTube limiter is held for each attempt only, never across
+        the backoff sleeps between retries.
+        """
+        async with self.limiter:
+            return await asyncio.to_thread(func, *args)
+    
+    async def get_transcript_from_api(self, video_id: str, language: str = 'en') -> Optional[Dict]:
         """
         Use youtube-transcript-api to get the transcript
-        Using the CORRECT static method approach
+        
+        Lists the available transcripts once, picks the best track locally
+        and fetches only that one.
+        
+        Raises:
+            TooManyRequests: If YouTube is throttling (not retried)
         """
         try:
             logger.info(f"Fetching transcript using API for video: {video_id}")
             
-            # Method 1: Try to get transcript with language preference
-            try:
-                # Use the static method directly
-                transcript_data = YouTubeTranscriptApi.get_transcript(
-                    video_id, 
-                    languages=[language, 'en', 'en-US', 'en-GB']
-                )
-                
-                logger.info(f"Got transcript with {len(transcript_data)} segments")
-                
-                return {
-                    'segments': transcript_data,
-                    'language': language,
-                    'is_generated': False  # We can't determine this easily with static method
-                }
-                
-            except:
-                # Try without language specification
-                try:
-                    transcript_data = YouTubeTranscriptApi.get_transcript(video_id)
-                    logger.info(f"Got transcript (auto-detected language)")
-                    
-                    return {
-                        'segments': transcript_data,
-                        'language': 'auto',
-                        'is_generated': False
-                    }
-                except:
-                    pass
+            transcript_list = await self._api_call(YouTubeTranscriptApi.list_transcripts, video_id)
+            transcript = self._pick_api_transcript(transcript_list, language)
+            if transcript is None:
+                logger.warning(f"No transcript found for video: {video_id}")
+                return None
             
-            # Method 2: Use list_transcripts to find available transcripts
-            try:
-                transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-                
-                # Try to find transcript in requested language
-                for transcript in transcript_list:
-                    try:
-                        if transcript.language_code.startswith(language):
-                            data = transcript.fetch()
-                            logger.info(f"Found transcript in {transcript.language_code}")
-                            return {
-                                'segments': data,
-                                'language': transcript.language_code,
-                                'is_generated': transcript.is_generated
-                            }
-                    except:
-                        continue
-                
-                # If no match, get the first available transcript
-                for transcript in transcript_list:
-                    try:
-                        data = transcript.fetch()
-                        logger.info(f"Using first available transcript: {transcript.language_code}")
-                        return {
-                            'segments': data,
-                            'language': transcript.language_code,
-                            'is_generated': transcript.is_generated
-                        }
-                    except:
-                        continue
-                        
-            except Exception as e:
-                logger.warning(f"list_transcripts method failed: {e}")
+            data = await self._api_call(transcript.fetch)
+            logger.info(f"Got {transcript.language_code} transcript with {len(data)} segments")
+            
+            return {
+                'segments': data,
+                'language': transcript.language_code,
+                'is_generated': transcript.is_generated
+            }
                 
+        except TooManyRequests:
+            logger.error(f"YouTube is rate limiting transcript requests for video: {video_id}")
+            raise
         except NoTranscriptFound:
             logger.warning(f"No transcript found for video: {video_id}")
         except TranscriptsDisabled:
@@ -195,48 +671,83 @@ class TranscriptService:
         
         return None
     
-    def get_transcript_with_beautifulsoup_fallback(self, video_url: str) -> Optional[Dict]:
+    @staticmethod
+    def _pick_api_transcript(transcript_list, language: str):
+        """
+        Choose a transcript from a listing without fetching any of them
+        
+        Preference: exact match for the requested language or English
+        (manual before generated), then any track in the requested
+        language's family (e.g. en-IN for en), then the first available.
+        """
+        try:
+            return transcript_list.find_transcript([language, 'en', 'en-US', 'en-GB'])
+        except NoTranscriptFound:
+            pass
+        
+        transcripts = list(transcript_list)
+        for transcript in transcripts:
+            if transcript.language_code.startswith(language):
+                return transcript
+        return transcripts[0] if transcripts else None
+    
+    async def get_transcript_with_beautifulsoup_fallback(
+        self,
+        video_url: str,
+        language: str = 'en'
+    ) -> Optional[Dict]:
         """
         Fallback method: Try to extract transcript data from page HTML
+        
+        Raises:
+            BackendThrottled: If YouTube answers with HTTP 429
         """
         video_id = self.extract_video_id(video_url)
         if not video_id:
             return None
         
         try:
-            full_url = f"https://www.youtube.com/watch?v={video_id}"
-            response = self.session.get(full_url, timeout=10)
+            # Usually already downloaded (or in flight) for get_video_metadata
+            try:
+                page_text = await self.get_watch_page(video_id)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 429:
+                    raise BackendThrottled(f"Watch page throttled for video: {video_id}")
+                raise
             
             # Look for caption tracks in the initial player response
-            pattern = r'ytInitialPlayerResponse\s*=\s*({.+?})\s*;'
-            match = re.search(pattern, response.text)
+            try:
+                player_response = _parse_player_response(page_text)
+            except json.JSONDecodeError:
+                player_response = None
             
-            if match:
+            if player_response:
                 try:
-                    player_response = json.loads(match.group(1))
                     captions = player_response.get('captions', {})
                     caption_tracks = captions.get('playerCaptionsTracklistRenderer', {}).get('captionTracks', [])
                     
                     if caption_tracks:
+                        # Prefer tracks in the requested language
+                        caption_tracks = sorted(
+                            caption_tracks,
+                            key=lambda track: not track.get('languageCode', '').startswith(language)
+                        )
+                        
                         # Found caption track URLs
                         for track in caption_tracks:
                             base_url = track.get('baseUrl')
                             if base_url:
                                 # Fetch the captions
-                                caption_response = self.session.get(base_url + '&fmt=json3', timeout=10)
+                                caption_response = await self.http_get(base_url + '&fmt=json3')
+                                if caption_response.status_code == 429:
+                                    raise BackendThrottled(f"Caption track throttled for video: {video_id}")
                                 if caption_response.status_code == 200:
-                                    caption_data = caption_response.json()
-                                    
-                                    # Process into segments
-                                    segments = []
-                                    for event in caption_data.get('events', []):
-                                        if 'segs' in event:
-                                            text = ''.join([seg.get('utf8', '') for seg in event['segs']])
-                                            segments.append({
-                                                'text': text,
-                                                'start': event.get('tStartMs', 0) / 1000,
-                                                'duration': event.get('dDurationMs', 0) / 1000
-                                            })
+                                    # An empty or non-JSON body only rules out
+                                    # this track, not the remaining languages
+                                    try:
+                                        segments = _parse_json3(orjson.loads(caption_response.content))
+                                    except orjson.JSONDecodeError:
+                                        continue
                                     
                                     if segments:
                                         logger.info(f"Got transcript via BeautifulSoup fallback")
@@ -245,66 +756,101 @@ class TranscriptService:
                                             'language': track.get('languageCode', 'en'),
                                             'is_generated': track.get('kind') == 'asr'
                                         }
-                except json.JSONDecodeError:
-                    pass
+                except BackendThrottled:
+                    raise
                 except Exception as e:
                     logger.error(f"Error parsing player response: {e}")
                     
+        except BackendThrottled:
+            raise
         except Exception as e:
             logger.error(f"Error in BeautifulSoup fallback: {e}")
         
         return None
     
-    def get_transcript(
+    async def get_transcript(
         self,
         video_url: str, 
         language: str = 'en',
-        preserve_formatting: bool = False
+        preserve_formatting: bool = False,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """
         Main method: Get transcript using hybrid approach
+        
+        Args:
+            use_cache: Serve from and store to the memory and disk caches
+        
+        The result's 'cache' key names the tier that served it ('memory' or
+        'disk'), or is None when the transcript was fetched from YouTube.
         """
         # Extract video ID
         video_id = self.extract_video_id(video_url)
         if not video_id:
             raise ValueError(f"Could not extract video ID from URL: {video_url}")
         
-        # Step 1: Get metadata using BeautifulSoup
-        metadata = self.get_video_metadata(video_url)
+        cache_key = (video_id, language, preserve_formatting)
+        if use_cache:
+            cached = await transcript_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Transcript cache hit for {video_id}")
+                return {**cached, 'cache': 'memory'}
         
-        # Step 2: Try to get transcript using API
-        transcript_data = self.get_transcript_from_api(video_id, language)
-        
-        # Step 3: If API fails, try BeautifulSoup fallback
-        if not transcript_data:
-            logger.warning("API failed, trying BeautifulSoup fallback...")
-            transcript_data = self.get_transcript_with_beautifulsoup_fallback(video_url)
-        
-        if not transcript_data:
-            raise Exception(
-                f"Could not fetch transcript using any method. "
-                f"The video may not have captions enabled or they may be restricted."
+        # Transcripts don't change, so a disk hit skips both YouTube requests
+        disk_entry = await disk_cache.get((video_id, language)) if use_cache else None
+        if disk_entry is not None:
+            logger.info(f"Transcript disk cache hit for {video_id}")
+            metadata, transcript_data = disk_entry['metadata'], disk_entry['transcript']
+        else:
+            # Fetch metadata and transcript concurrently. The transcript comes
+            # from the first backend in the cascade that isn't throttled.
+            metadata, transcript_data = await asyncio.gather(
+                self.get_video_metadata(video_url),
+                self._fetch_transcript_data(video_id, language, use_cache),
+                return_exceptions=True
             )
+            
+            if isinstance(metadata, BaseException):
+                logger.error(f"Metadata fetch failed: {metadata}")
+                metadata = {}
+            
+            if isinstance(transcript_data, BaseException):
+                logger.error(f"Transcript fetch failed: {transcript_data}")
+                transcript_data = None
+            
+            if not transcript_data:
+                raise Exception(
+                    f"Could not fetch transcript using any method. "
+                    f"The video may not have captions enabled or they may be restricted."
+                )
+            
+            # Only persist once the page metadata was fetched successfully
+            if use_cache and metadata.get('video_title', 'Unknown Title') != 'Unknown Title':
+                await disk_cache.set(
+                    (video_id, language),
+                    {'metadata': metadata, 'transcript': transcript_data}
+                )
         
         # Process the transcript segments
         segments = transcript_data['segments']
         
-        # Create full text from segments
-        if preserve_formatting:
-            full_text = '\n'.join([segment['text'] for segment in segments])
-        else:
-            # Simply join all text with spaces
-            full_text = ' '.join([segment['text'] for segment in segments])
+        # Create full text from segments, counting words on the way rather
+        # than splitting the whole text again afterwards
+        parts = []
+        word_count = 0
+        for segment in segments:
+            text = segment['text']
+            parts.append(text)
+            word_count += len(text.split())
+        full_text = ('\n' if preserve_formatting else ' ').join(parts)
         
-        # Calculate total duration
-        total_duration = 0
+        # Calculate total duration from the last segment (segments are
+        # time-ordered, so there's no need to scan them all). Every backend
+        # produces segments with text/start/duration keys.
+        total_duration = 0.0
         if segments:
-            for segment in segments:
-                duration = segment.get('duration', 0)
-                start = segment.get('start', 0)
-                end_time = start + duration
-                if end_time > total_duration:
-                    total_duration = end_time
+            last_segment = segments[-1]
+            total_duration = last_segment['start'] + last_segment['duration']
         
         # Combine everything
         result = {
@@ -318,23 +864,71 @@ class TranscriptService:
             'segments': segments,
             'full_text': full_text,
             'duration': total_duration,
-            'word_count': len(full_text.split())
+            'word_count': word_count,
+            'cache': 'disk' if disk_entry is not None else None
         }
         
+        if use_cache:
+            await transcript_cache.set(cache_key, result)
+        
         logger.info(f"Successfully extracted transcript for {video_id}")
         return result
     
+    async def _fetch_transcript_data(
+        self,
+        video_id: str,
+        language: str,
+        use_cache: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch raw transcript data through the backend cascade, memoized per (video_id, language)"""
+        cache_key = (video_id, language)
+        if use_cache:
+            cached = await fetched_transcript_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        transcript_data = await self.backend.fetch(video_id, language)
+        if transcript_data and use_cache:
+            await fetched_transcript_cache.set(cache_key, transcript_data)
+        return transcript_data
+    
+    async def get_many(
+        self,
+        video_urls: List[str],
+        language: str = 'en',
+        preserve_formatting: bool = False
+    ) -> List[Any]:
+        """
+        Get transcripts for several videos concurrently
+        
+        Returns:
+            One entry per URL, in order: the transcript dict, or the
+            exception raised for that video
+        """
+        return await asyncio.gather(
+            *(self.get_transcript(url, language, preserve_formatting) for url in video_urls),
+            return_exceptions=True
+        )
+    
+    @staticmethod
+    def is_transcript_cached(
+        video_id: str,
+        language: str = 'en',
+        preserve_formatting: bool = False
+    ) -> bool:
+        """Check whether get_transcript would be served from the cache"""
+        return (video_id, language, preserve_formatting) in transcript_cache
+    
     @staticmethod
     def clean_transcript(text: str) -> str:
         """
         Clean transcript text for better processing
         """
         # Remove multiple spaces
-        text = re.sub(r'\s+', ' ', text)
+        text = _WHITESPACE_RE.sub(' ', text)
         
         # Remove music/sound effect annotations
-        text = re.sub(r'\[.*?\]', '', text)
-        text = re.sub(r'\(.*?\)', '', text)
+        text = _ANNOTATION_RE.sub('', text)
         
         # Fix common transcript issues
         text = text.replace('\n', ' ')
@@ -5,22 +5,27 @@ Test script to demonstrate the hybrid approach:
 - Fallback to BeautifulSoup scraping if needed
 """
 
-from services.transcript import TranscriptService
+from services.transcript import TranscriptService, aclose_shared_http_client
+import asyncio
 import json
+import sys
+import time
 
-def test_video(url):
+async def test_video(url, service=None):
     """Test transcript extraction for a video"""
     print("=" * 60)
     print(f"Testing URL: {url}")
     print("=" * 60)
     
-    # Initialize the service
-    service = TranscriptService()
+    # Initialize the service unless the caller shares one
+    owns_service = service is None
+    if owns_service:
+        service = TranscriptService()
     
     try:
         # Step 1: Get metadata with BeautifulSoup
         print("\n📝 Step 1: Extracting metadata with BeautifulSoup...")
-        metadata = service.get_video_metadata(url)
+        metadata = await service.get_video_metadata(url)
         print(f"✅ Title: {metadata.get('video_title', 'Unknown')}")
         print(f"✅ Video ID: {metadata.get('video_id', 'Unknown')}")
         if metadata.get('channel_name'):
@@ -28,7 +33,7 @@ def test_video(url):
         
         # Step 2: Get full transcript data
         print("\n📜 Step 2: Extracting transcript...")
-        result = service.get_transcript(url)
+        result = await service.get_transcript(url)
         
         print(f"✅ Transcript extracted successfully!")
         print(f"   - Language: {result['language']}")
@@ -54,10 +59,32 @@ def test_video(url):
     except Exception as e:
         print(f"\n❌ Error: {e}")
         return False
+    finally:
+        if owns_service:
+            await service.aclose()
+            # The shared client is bound to this asyncio.run's event loop
+            await aclose_shared_http_client()
+
+
+async def test_batch(urls):
+    """Test all videos concurrently with one shared service"""
+    service = TranscriptService()
+    try:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(test_video(url, service) for url in urls))
+        print(f"\n⏱️  Fetched {len(urls)} videos in {time.perf_counter() - start:.2f} seconds")
+        return sum(results)
+    finally:
+        await service.aclose()
+        await aclose_shared_http_client()
 
 
 def main():
-    """Test multiple videos with the hybrid approach"""
+    """
+    Test multiple videos with the hybrid approach
+    
+    Pass --batch to test all videos concurrently instead of one at a time
+    """
     
     test_urls = [
         # The video from your original test
@@ -79,10 +106,15 @@ def main():
     print("3. BeautifulSoup fallback for difficult cases")
     print("=" * 60)
     
+    if "--batch" in sys.argv[1:]:
+        success_count = asyncio.run(test_batch(test_urls))
+        print(f"\n✅ Successfully extracted {success_count}/{len(test_urls)} transcripts")
+        return
+    
     success_count = 0
     
     for url in test_urls:
-        if test_video(url):
+        if asyncio.run(test_video(url)):
             success_count += 1
         
         print("\n" + "=" * 60)
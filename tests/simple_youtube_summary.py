@@ -1,116 +1,127 @@
 """
 Simple YouTube Video Summarizer Script
 Following the approach from the video tutorial:
-1. Use BeautifulSoup to get the title
+1. Read the title from the page's <title> tag
 2. Use youtube-transcript-api to get transcript
 3. Use OpenAI to summarize and generate tags
 """
 
 from youtube_transcript_api import YouTubeTranscriptApi
-import requests
-from bs4 import BeautifulSoup
-import openai
+from openai import AsyncOpenAI
+import asyncio
+import httpx
 import os
 import re
+import html
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Set OpenAI API key
-openai.api_key = os.getenv("OPENAI_API_KEY")
-
 # URL - you can copy and paste any YouTube URL here
 url = "https://www.youtube.com/watch?v=0fONene3OIA"
 
-print(f"Processing: {url}\n")
-
-# Get the page using requests (as shown in video)
-page = requests.get(url)
-soup = BeautifulSoup(page.text, 'html.parser')
-
-# Get the title of the page
-title = soup.find('title').text.replace(' - YouTube', '')
-print(f"Title: {title}")
-
-# Extract video ID from URL (as shown in video)
-video_id = None
-if 'youtu.be' in url:
-    # Short URL format
-    video_id = url.split('/')[-1].split('?')[0]
-elif 'youtube.com' in url and 'v=' in url:
-    # Standard URL format
-    video_id = url.split('v=')[1].split('&')[0]
-
-print(f"Video ID: {video_id}")
-
-# Get transcript using youtube-transcript-api (as shown in video)
-try:
-    transcript = YouTubeTranscriptApi.get_transcript(video_id)
-    
-    # Parse transcript (combine all text)
-    output = ""
-    for segment in transcript:
-        output += segment['text'] + " "
-    
-    print(f"Transcript length: {len(output)} characters")
-    print("Processing with ChatGPT...\n")
-    
-    # Get summary from ChatGPT (as shown in video)
-    response = openai.ChatCompletion.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": "You are a journalist."},
-            {"role": "user", "content": f"Write a 100 word summary of this video: {output[:4000]}"}  # Limit to 4000 chars for token limit
-        ],
-        max_tokens=200,
-        temperature=0.7
-    )
-    
-    summary = response.choices[0].message.content
-    print("SUMMARY:")
-    print("-" * 50)
-    print(summary)
-    
-    # Get tags from ChatGPT (as shown in video)
-    tag_response = openai.ChatCompletion.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": "You are a content tagger."},
-            {"role": "user", "content": f"Output a list of tags for this blog post in a Python list such as ['item1', 'item2', 'item3']: {output[:4000]}"}
-        ],
-        max_tokens=100,
-        temperature=0.5
-    )
-    
-    tags = tag_response.choices[0].message.content
-    print("\nTAGS:")
-    print("-" * 50)
-    print(tags)
-    
-    # Write to HTML file (as shown in video)
-    with open('video_summary.html', 'w') as f:
-        f.write(f"<html><head><title>{title}</title></head><body>")
-        f.write(f"<h1>{title}</h1>")
-        f.write(f"<p><strong>Video ID:</strong> {video_id}</p>")
-        f.write(f"<h2>Summary</h2><p>{summary}</p>")
-        f.write(f"<h2>Tags</h2><p>{tags}</p>")
-        f.write(f"<h2>Full Transcript</h2>")
-        
+
+async def main():
+    # OpenAI client (reads OPENAI_API_KEY from the environment)
+    client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+    print(f"Processing: {url}\n")
+
+    # Extract video ID from URL (as shown in video)
+    video_id = None
+    if 'youtu.be' in url:
+        # Short URL format
+        video_id = url.split('/')[-1].split('?')[0]
+    elif 'youtube.com' in url and 'v=' in url:
+        # Standard URL format
+        video_id = url.split('v=')[1].split('&')[0]
+
+    print(f"Video ID: {video_id}")
+
+    try:
+        # Get the page and the transcript (youtube-transcript-api, as shown in
+        # video) at the same time; they don't depend on each other
+        async with httpx.AsyncClient(follow_redirects=True) as http:
+            page, transcript = await asyncio.gather(
+                http.get(url),
+                asyncio.to_thread(YouTubeTranscriptApi.get_transcript, video_id)
+            )
+
+        # Get the title of the page; a regex is enough for a single tag
+        match = re.search(r'<title>([^<]+)</title>', page.text)
+        title = html.unescape(match.group(1)).replace(' - YouTube', '') if match else 'Unknown'
+        print(f"Title: {title}")
+
+        # Parse transcript (combine all text)
+        output = " ".join(segment['text'] for segment in transcript)
+
+        print(f"Transcript length: {len(output)} characters")
+        print("Processing with ChatGPT...\n")
+
+        # Get summary and tags from ChatGPT (as shown in video); the two
+        # requests are independent, so send them together
+        response, tag_response = await asyncio.gather(
+            client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": "You are a journalist."},
+                    {"role": "user", "content": f"Write a 100 word summary of this video: {output[:4000]}"}  # Limit to 4000 chars for token limit
+                ],
+                max_tokens=200,
+                temperature=0.7
+            ),
+            client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": "You are a content tagger."},
+                    {"role": "user", "content": f"Output a list of tags for this blog post in a Python list such as ['item1', 'item2', 'item3']: {output[:4000]}"}
+                ],
+                max_tokens=100,
+                temperature=0.5
+            )
+        )
+
+        summary = response.choices[0].message.content
+        print("SUMMARY:")
+        print("-" * 50)
+        print(summary)
+
+        tags = tag_response.choices[0].message.content
+        print("\nTAGS:")
+        print("-" * 50)
+        print(tags)
+
+        # Write to HTML file (as shown in video), built up front and written once
         # Split transcript by lines for better formatting
-        for line in output.split('\n'):
-            f.write(f"<p>{line}</p>")
-        
-        f.write("</body></html>")
-    
-    print("\n✅ HTML file created: video_summary.html")
-    print("\nFULL TRANSCRIPT (first 500 chars):")
-    print("-" * 50)
-    print(output[:500] + "...")
-    
-except Exception as e:
-    print(f"Error: {e}")
-    print("\nTroubleshooting:")
-    print("1. Make sure the video has captions enabled")
-    print("2. Check your OpenAI API key in .env")
-    print("3. Try a different video URL")
\ No newline at end of file
+        transcript_html = ''.join(f"<p>{html.escape(line)}</p>" for line in output.split('\n'))
+        page_title = html.escape(title)
+        with open('video_summary.html', 'w', encoding='utf-8') as f:
+            f.write(
+                f"<html><head><title>{page_title}</title></head><body>"
+                f"<h1>{page_title}</h1>"
+                f"<p><strong>Video ID:</strong> {html.escape(str(video_id))}</p>"
+                f"<h2>Summary</h2><p>{html.escape(summary)}</p>"
+                f"<h2>Tags</h2><p>{html.escape(tags)}</p>"
+                f"<h2>Full Transcript</h2>"
+                f"{transcript_html}"
+                "</body></html>"
+            )
+
+        print("\n✅ HTML file created: video_summary.html")
+        print("\nFULL TRANSCRIPT (first 500 chars):")
+        print("-" * 50)
+        print(output[:500] + "...")
+
+    except Exception as e:
+        print(f"Error: {e}")
+        print("\nTroubleshooting:")
+        print("1. Make sure the video has captions enabled")
+        print("2. Check your OpenAI API key in .env")
+        print("3. Try a different video URL")
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+"""
+Tests for AIProcessor transcript chunking and chunk merging
+"""
+import pytest
+
+from services.ai_processor import AIProcessor
+
+
+class StubEncoding:
+    """One token per whitespace-separated word; no BPE file needed"""
+
+    def encode_ordinary_batch(self, texts):
+        return [text.split() for text in texts]
+
+
+@pytest.fixture
+def processor():
+    # Skip __init__: it needs an OpenAI API key and these methods don't
+    instance = AIProcessor.__new__(AIProcessor)
+    instance._encoding = StubEncoding()
+    return instance
+
+
+def make_segments(word_counts):
+    """Segments whose words name their segment, e.g. 's3w0 s3w1'"""
+    return [
+        {'text': ' '.join(f"s{i}w{j}" for j in range(count))}
+        for i, count in enumerate(word_counts)
+    ]
+
+
+def window_segments(chunk):
+    """Segment indices making up a chunk, in order"""
+    indices = []
+    for word in chunk.split():
+        index = int(word[1:word.index('w')])
+        if not indices or indices[-1] != index:
+            indices.append(index)
+    return indices
+
+
+def test_windows_fit_and_break_between_segments(processor):
+    counts = [3, 5, 2, 4, 6, 1, 3, 5, 2]
+    segments = make_segments(counts)
+
+    chunks = processor._chunk_transcript(segments, max_tokens=10, overlap_tokens=4)
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert len(chunk.split()) <= 10
+        indices = window_segments(chunk)
+        # Contiguous whole segments only
+        assert indices == list(range(indices[0], indices[-1] + 1))
+        assert chunk == ' '.join(segments[i]['text'] for i in indices)
+    # Every segment appears somewhere, in order
+    assert window_segments(chunks[0])[0] == 0
+    assert window_segments(chunks[-1])[-1] == len(segments) - 1
+
+
+def test_overlap_carry_is_bounded(processor):
+    counts = [3, 5, 2, 4, 6, 1, 3, 5, 2]
+    max_tokens, overlap_tokens = 10, 4
+
+    chunks = processor._chunk_transcript(
+        make_segments(counts), max_tokens=max_tokens, overlap_tokens=overlap_tokens
+    )
+    windows = [window_segments(chunk) for chunk in chunks]
+
+    for previous, current in zip(windows, windows[1:]):
+        carried = [i for i in current if i in previous]
+        # The carry is a tail of the previous window at the head of this one
+        assert carried == previous[len(previous) - len(carried):]
+        assert current[:len(carried)] == carried
+
+        next_segment = current[len(carried)]
+        limit = min(overlap_tokens, max_tokens - counts[next_segment])
+        assert sum(counts[i] for i in carried) <= limit
+
+
+def test_oversized_segment_gets_its_own_window(processor):
+    counts = [3, 25, 2]
+    segments = make_segments(counts)
+
+    chunks = processor._chunk_transcript(segments, max_tokens=10, overlap_tokens=4)
+
+    assert segments[1]['text'] in chunks
+    assert [window_segments(chunk) for chunk in chunks] == [[0], [1], [2]]
+
+
+def test_merge_keeps_cards_from_every_chunk():
+    per_chunk = [
+        [{'question': f"Chunk {c} question {n}?"} for n in range(4)]
+        for c in range(3)
+    ]
+    # Same question (modulo case and punctuation) repeated in a later chunk
+    per_chunk[1][0] = {'question': "chunk 0 question 0"}
+
+    merged = AIProcessor._merge_chunk_cards(per_chunk, num_cards=5)
+
+    questions = [card['question'] for card in merged]
+    assert len(merged) == 5
+    assert "chunk 0 question 0" not in questions
+    for c in range(3):
+        assert any(q.startswith(f"Chunk {c} ") for q in questions)